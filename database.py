@@ -6,70 +6,511 @@ Manages processed and non-processed directories with SQLite
 
 import sqlite3
 import os
+import atexit
+import json
+import queue
+import threading
+from collections import deque
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Tuple, Optional
 import logging
 
+# Statuses are stored as small integers: a 1-byte varint per row/index entry
+# instead of a 7-10 byte string, and integer comparisons in the WHERE clauses.
+# The public API still speaks the status names; translation happens at the
+# SQL boundary.
+_STATUS_CODES = {
+    'pending': 0,
+    'processing': 1,
+    'completed': 2,
+    'failed': 3,
+    'queued': 4,
+}
+_STATUS_NAMES = {code: name for name, code in _STATUS_CODES.items()}
+
+# SQL expression translating a legacy TEXT status into its integer code
+_STATUS_CASE_SQL = ('CASE status ' +
+                    ' '.join(f"WHEN '{name}' THEN {code}"
+                             for name, code in _STATUS_CODES.items()) +
+                    ' ELSE 0 END')
+
+# Plain INTEGER PRIMARY KEY rowid aliases: AUTOINCREMENT adds a
+# sqlite_sequence bookkeeping update on every insert and nothing here needs
+# IDs that stay unique across deletes
+_DIRECTORIES_DDL = '''
+    CREATE TABLE IF NOT EXISTS directories (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        full_path TEXT NOT NULL,
+        status INTEGER NOT NULL DEFAULT 0,
+        image_count INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        processed_at TIMESTAMP NULL,
+        error_message TEXT NULL,
+        processing_time_seconds INTEGER DEFAULT 0,
+        file_size_kb INTEGER DEFAULT 0,
+        has_exposure_correction BOOLEAN DEFAULT FALSE
+    )
+'''
+
+_PROCESSING_LOG_DDL = '''
+    CREATE TABLE IF NOT EXISTS processing_log (
+        id INTEGER PRIMARY KEY,
+        directory_id INTEGER,
+        action TEXT NOT NULL,
+        message TEXT,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (directory_id) REFERENCES directories (id)
+    )
+'''
+
+# Whole schema bootstrapped as one atomic script: a single parse pass, and
+# no half-initialized schema if the process dies mid-init
+_SCHEMA_SCRIPT = f'''
+BEGIN;
+
+{_DIRECTORIES_DDL};
+
+{_PROCESSING_LOG_DDL};
+
+CREATE INDEX IF NOT EXISTS idx_directories_status ON directories (status);
+CREATE INDEX IF NOT EXISTS idx_directories_name ON directories (name);
+CREATE INDEX IF NOT EXISTS idx_processing_log_directory_id ON processing_log (directory_id);
+
+-- Partial index over the active statuses only: completed/failed rows
+-- dominate the table over time, so this stays small and is the natural
+-- pick for the pending/queued scans
+CREATE INDEX IF NOT EXISTS idx_directories_active
+ON directories (status, created_at)
+WHERE status IN (0, 1, 4);
+
+-- Covers get_directory_history's ORDER BY timestamp DESC so the query
+-- avoids an external sort
+CREATE INDEX IF NOT EXISTS idx_log_dir_ts
+ON processing_log (directory_id, timestamp DESC);
+
+COMMIT;
+'''
+
+# Hot-path SQL kept as module-level constants so the sqlite3 statement cache
+# (keyed on the SQL text) always hits the same compiled statement
+_LOG_INSERT_SQL = '''
+    INSERT INTO processing_log (directory_id, action, message, timestamp)
+    VALUES (?, ?, ?, ?)
+'''
+
+# Single stable statement shape for status updates; processed_at is set by
+# SQLite itself on completion, consistent with the updated_at column, so no
+# Python-side timestamp formatting is needed
+_STATUS_UPDATE_SQL = '''
+    UPDATE directories
+    SET status = ?, error_message = ?, updated_at = CURRENT_TIMESTAMP,
+        processed_at = CASE WHEN ? = 2 THEN CURRENT_TIMESTAMP ELSE NULL END,
+        processing_time_seconds = ?, has_exposure_correction = ?
+    WHERE name = ?
+'''
+
+# Single-statement insert-or-update for add_directory; the RETURNING variant
+# also reports whether the row was freshly inserted (created this statement)
+_DIR_UPSERT_SQL = '''
+    INSERT INTO directories (name, full_path, image_count, file_size_kb)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(name) DO UPDATE SET
+        full_path = excluded.full_path,
+        image_count = excluded.image_count,
+        file_size_kb = excluded.file_size_kb,
+        updated_at = CURRENT_TIMESTAMP
+'''
+
+# RETURNING (SQLite >= 3.35) collapses the update and the id lookup for
+# logging into a single statement
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Optional covering index for read-heavy deployments: satisfies
+# get_directories_by_status entirely from the index (no table b-tree
+# lookups), limited to the active statuses to bound its size.
+# Heavier on writes, so only created when dense_reads is requested.
+# The WHERE clause is spelled as ORs, not IN: the query planner's
+# theorem prover does not recognise "status = ?" as implying
+# "status IN (...)", but does match it against the OR form.
+_DIR_COVER_INDEX_SQL = '''
+    CREATE INDEX IF NOT EXISTS idx_dir_status_cover
+    ON directories (status, created_at, name, full_path, image_count,
+                    updated_at, processed_at, error_message,
+                    processing_time_seconds, file_size_kb,
+                    has_exposure_correction)
+    WHERE status = 0 OR status = 1 OR status = 4
+'''
+_STATUS_UPDATE_RETURNING_SQL = _STATUS_UPDATE_SQL + ' RETURNING id'
+_DIR_UPSERT_RETURNING_SQL = _DIR_UPSERT_SQL + ' RETURNING id, created_at = CURRENT_TIMESTAMP'
+
 class ProcessingDatabase:
-    def __init__(self, db_path: str = "processing_database.db"):
+    # Read-only connections kept alive for get_* methods (1 writer + N readers)
+    READ_POOL_SIZE = 4
+
+    # Log entries buffered in memory before a batched executemany flush
+    LOG_FLUSH_THRESHOLD = 100
+    LOG_FLUSH_INTERVAL = 5.0  # seconds
+
+    def __init__(self, db_path: str = "processing_database.db",
+                 use_memory: bool = False, log_to_db: bool = False,
+                 dense_reads: bool = False):
         """
         Initialize the processing database
-        
+
         Args:
             db_path: Path to SQLite database file
+            use_memory: Keep the working database in memory (no disk IO);
+                        db_path is then only used to load existing data at
+                        startup and to persist a snapshot on close()
+            log_to_db: Write audit log entries into the processing_log table.
+                       Off by default: the append-only history goes to a
+                       sidecar NDJSON file instead, halving the rows written
+                       per status transition and keeping the SQLite file small
+            dense_reads: Maintain a covering index over the active-status
+                         queries so they never touch the table b-tree.
+                         Makes writes slightly more expensive; worth it when
+                         the UI polls status lists far more often than
+                         directories change state
         """
+        self.persist_path = None
+        if use_memory and db_path != ':memory:':
+            self.persist_path = db_path
+            db_path = ':memory:'
         self.db_path = db_path
+        self.dense_reads = dense_reads
         self.logger = logging.getLogger(__name__)
+
+        # A pure in-memory database has no sensible sidecar location, so it
+        # keeps its log in the database
+        log_file_base = self.persist_path or self.db_path
+        if log_file_base == ':memory:':
+            log_to_db = True
+        self.log_to_db = log_to_db
+        self._ndjson_path = None if log_to_db else log_file_base + '.log.ndjson'
+        self._ndjson_file = None
+        self._ndjson_lock = threading.Lock()
+        # RLock because write methods (e.g. add_directory) call add_log_entry
+        # while already holding the lock
+        self._write_lock = threading.RLock()
+        self._write_conn = None
+        self._read_pool = None
+        # Log entries are buffered here and flushed in one transaction
+        # instead of paying a commit per entry
+        self._log_buf = deque()
+        self._log_flush_timer = None
         self._init_database()
+        self._schedule_log_flush()
+        atexit.register(self.flush_logs)
     
+    def _apply_pragmas(self, conn):
+        """Apply performance-oriented PRAGMA settings to a connection"""
+        # WAL mode and relaxed sync amortize fsync cost across commits and
+        # let readers run concurrently with the writer. Not applicable to
+        # in-memory databases.
+        if self.db_path != ':memory:':
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA wal_autocheckpoint=1000')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA busy_timeout=5000')
+        conn.execute('PRAGMA cache_size=-20000')  # ~20 MB page cache
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA foreign_keys=ON')
+
     def _init_database(self):
-        """Initialize database tables"""
+        """Initialize database tables and long-lived connections"""
         try:
-            with sqlite3.connect(self.db_path, timeout=10.0) as conn:
-                cursor = conn.cursor()
-                
-                # Create directories table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS directories (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        name TEXT NOT NULL UNIQUE,
-                        full_path TEXT NOT NULL,
-                        status TEXT NOT NULL DEFAULT 'pending',
-                        image_count INTEGER DEFAULT 0,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        processed_at TIMESTAMP NULL,
-                        error_message TEXT NULL,
-                        processing_time_seconds INTEGER DEFAULT 0,
-                        file_size_mb REAL DEFAULT 0.0,
-                        has_exposure_correction BOOLEAN DEFAULT FALSE
-                    )
-                ''')
-                
-                # Create processing_log table for detailed history
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS processing_log (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        directory_id INTEGER,
-                        action TEXT NOT NULL,
-                        message TEXT,
-                        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (directory_id) REFERENCES directories (id)
+            # Single long-lived read-write connection shared by all write
+            # methods; reopening per call costs extra syscalls and a WAL
+            # reattach every time
+            # isolation_level=None: transactions are managed explicitly with
+            # BEGIN IMMEDIATE in _write_cursor
+            self._write_conn = sqlite3.connect(
+                self.db_path, timeout=10.0, check_same_thread=False,
+                cached_statements=128, isolation_level=None
+            )
+            # Row gives name-based access without a per-row dict/zip build
+            self._write_conn.row_factory = sqlite3.Row
+            self._apply_pragmas(self._write_conn)
+
+            # Memory mode: seed the working database from the on-disk
+            # snapshot of a previous run, if one exists
+            if self.persist_path and os.path.exists(self.persist_path):
+                disk_conn = sqlite3.connect(self.persist_path, timeout=10.0)
+                try:
+                    disk_conn.backup(self._write_conn)
+                finally:
+                    disk_conn.close()
+                self.logger.info(f"Loaded database snapshot from {self.persist_path}")
+
+            # Sanity-check that WAL actually took effect (it silently
+            # falls back on filesystems that do not support it)
+            if self.db_path != ':memory:':
+                journal_mode = self._write_conn.execute('PRAGMA journal_mode').fetchone()[0]
+                if journal_mode.lower() != 'wal':
+                    self.logger.warning(f"WAL journal mode unavailable, using: {journal_mode}")
+
+            cursor = self._write_conn.cursor()
+
+            # Rebuild tables created by older versions with AUTOINCREMENT
+            self._migrate_drop_autoincrement(cursor)
+
+            # Convert legacy text statuses to the integer codes
+            self._migrate_status_codes(cursor)
+
+            # Convert legacy MB sizes to integer kilobytes
+            self._migrate_file_size_kb(cursor)
+
+            # Create tables and indexes atomically in one parsed script
+            self._write_conn.executescript(_SCHEMA_SCRIPT)
+
+            # The covering index only pays off under read-heavy polling;
+            # keep it in sync with the option so toggling it off also
+            # removes the write overhead
+            if self.dense_reads:
+                cursor.execute(_DIR_COVER_INDEX_SQL)
+            else:
+                cursor.execute('DROP INDEX IF EXISTS idx_dir_status_cover')
+
+            # Small pool of read-only connections so get_* methods never
+            # contend with the writer (not possible for :memory: databases,
+            # where a second connection would see a different database)
+            if self.db_path != ':memory:':
+                self._read_pool = queue.Queue(maxsize=self.READ_POOL_SIZE)
+                for _ in range(self.READ_POOL_SIZE):
+                    read_conn = sqlite3.connect(
+                        f'file:{self.db_path}?mode=ro', uri=True,
+                        timeout=10.0, check_same_thread=False,
+                        cached_statements=128
                     )
-                ''')
-                
-                # Create indexes for better performance
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_directories_status ON directories (status)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_directories_name ON directories (name)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_processing_log_directory_id ON processing_log (directory_id)')
-                
-                conn.commit()
-                self.logger.info(f"Database initialized: {self.db_path}")
-                
+                    read_conn.row_factory = sqlite3.Row
+                    read_conn.execute('PRAGMA busy_timeout=5000')
+                    self._read_pool.put(read_conn)
+
+            self.logger.info(f"Database initialized: {self.db_path}")
+
         except Exception as e:
             self.logger.error(f"Failed to initialize database: {e}")
             raise
+
+    def _migrate_drop_autoincrement(self, cursor):
+        """One-time rebuild of tables created with AUTOINCREMENT primary keys
+
+        The directories copy converts the legacy columns in the same
+        statement: a positional SELECT * would push TEXT statuses and REAL
+        file_size_mb values through the new columns' INTEGER affinity, and
+        whole-number sizes (99.0 -> 99) would come out the other side
+        indistinguishable from already-converted kilobyte counts.
+        """
+        cursor.execute('''
+            SELECT name FROM sqlite_master
+            WHERE type = 'table' AND name IN ('directories', 'processing_log')
+            AND sql LIKE '%AUTOINCREMENT%'
+        ''')
+        legacy_tables = [row[0] for row in cursor.fetchall()]
+        if not legacy_tables:
+            return
+
+        ddl = {'directories': _DIRECTORIES_DDL, 'processing_log': _PROCESSING_LOG_DDL}
+
+        # Foreign keys off during the rename dance (processing_log references
+        # directories)
+        cursor.execute('PRAGMA foreign_keys=OFF')
+        try:
+            for table in legacy_tables:
+                cursor.execute(f'ALTER TABLE {table} RENAME TO {table}_old')
+                cursor.execute(ddl[table])
+                if table == 'directories':
+                    cursor.execute('PRAGMA table_info(directories_old)')
+                    old_columns = {row[1]: row[2] for row in cursor.fetchall()}
+                    status_expr = (_STATUS_CASE_SQL
+                                   if old_columns.get('status', '').upper() == 'TEXT'
+                                   else 'status')
+                    size_expr = ('CAST(ROUND(file_size_mb * 1024) AS INTEGER)'
+                                 if 'file_size_mb' in old_columns
+                                 else 'file_size_kb')
+                    cursor.execute(f'''
+                        INSERT INTO directories
+                        SELECT id, name, full_path, {status_expr}, image_count,
+                               created_at, updated_at, processed_at, error_message,
+                               processing_time_seconds, {size_expr},
+                               has_exposure_correction
+                        FROM directories_old
+                    ''')
+                else:
+                    cursor.execute(f'INSERT INTO {table} SELECT * FROM {table}_old')
+                # Dropping the old table also frees its index names for the
+                # CREATE INDEX IF NOT EXISTS statements that follow
+                cursor.execute(f'DROP TABLE {table}_old')
+                cursor.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table,))
+            self._write_conn.commit()
+            self.logger.info(f"Dropped AUTOINCREMENT from: {', '.join(legacy_tables)}")
+        finally:
+            cursor.execute('PRAGMA foreign_keys=ON')
+
+    def _migrate_status_codes(self, cursor):
+        """One-time conversion of TEXT status values to the integer codes"""
+        cursor.execute('PRAGMA table_info(directories)')
+        columns = {row[1]: row[2] for row in cursor.fetchall()}
+        if not columns:
+            return  # Fresh database, nothing to migrate
+
+        if columns.get('status', '').upper() == 'TEXT':
+            # Rebuild so the column gets INTEGER affinity; also frees the old
+            # index names for recreation with the integer-based definitions
+            cursor.execute('PRAGMA foreign_keys=OFF')
+            try:
+                cursor.execute('ALTER TABLE directories RENAME TO directories_old')
+                cursor.execute(_DIRECTORIES_DDL)
+                cursor.execute(f'''
+                    INSERT INTO directories
+                    SELECT id, name, full_path, {_STATUS_CASE_SQL}, image_count,
+                           created_at, updated_at, processed_at, error_message,
+                           processing_time_seconds,
+                           CAST(ROUND(file_size_mb * 1024) AS INTEGER),
+                           has_exposure_correction
+                    FROM directories_old
+                ''')
+                cursor.execute('DROP TABLE directories_old')
+                self._write_conn.commit()
+                self.logger.info("Migrated status column to integer codes")
+            finally:
+                cursor.execute('PRAGMA foreign_keys=ON')
+        else:
+            # Column already INTEGER; fix up any stray text values (TEXT
+            # survives INTEGER affinity, so typeof() is reliable here)
+            cursor.execute(f'''
+                UPDATE directories SET status = {_STATUS_CASE_SQL}
+                WHERE typeof(status) = 'text'
+            ''')
+            self._write_conn.commit()
+
+    def _migrate_file_size_kb(self, cursor):
+        """One-time conversion of file_size_mb REAL to file_size_kb INTEGER
+
+        Integer kilobytes pack into small varints in the record format and
+        let SUM() in get_processing_stats accumulate in int64 instead of
+        floating point.
+        """
+        cursor.execute('PRAGMA table_info(directories)')
+        columns = {row[1] for row in cursor.fetchall()}
+        if not columns:
+            return  # Fresh database, nothing to migrate
+
+        if 'file_size_mb' not in columns:
+            # Already renamed (fresh schema, or converted in the same pass as
+            # the AUTOINCREMENT rebuild).  No typeof() fix-up here: INTEGER
+            # affinity turns whole-number MB floats into plain integers, so
+            # stray megabyte values can't be told apart from kilobyte counts.
+            return
+
+        # Rebuild so the column gets INTEGER affinity under its new name
+        cursor.execute('PRAGMA foreign_keys=OFF')
+        try:
+            cursor.execute('ALTER TABLE directories RENAME TO directories_old')
+            cursor.execute(_DIRECTORIES_DDL)
+            cursor.execute('''
+                INSERT INTO directories
+                SELECT id, name, full_path, status, image_count,
+                       created_at, updated_at, processed_at, error_message,
+                       processing_time_seconds,
+                       CAST(ROUND(file_size_mb * 1024) AS INTEGER),
+                       has_exposure_correction
+                FROM directories_old
+            ''')
+            cursor.execute('DROP TABLE directories_old')
+            self._write_conn.commit()
+            self.logger.info("Migrated file_size_mb to integer file_size_kb")
+        finally:
+            cursor.execute('PRAGMA foreign_keys=ON')
+
+    @contextmanager
+    def _write_cursor(self):
+        """Yield a cursor on the shared write connection, committing on success
+
+        The transaction is opened with BEGIN IMMEDIATE so the write lock is
+        taken up front; combined with busy_timeout this blocks briefly under
+        contention instead of failing mid-transaction on a deferred upgrade.
+        """
+        with self._write_lock:
+            cursor = self._write_conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                yield cursor
+                self._write_conn.execute('COMMIT')
+            except Exception:
+                self._write_conn.execute('ROLLBACK')
+                raise
+
+    @contextmanager
+    def _read_cursor(self):
+        """Borrow a read-only connection from the pool and yield a cursor"""
+        if self._read_pool is None:
+            # In-memory database: reads share the write connection
+            with self._write_lock:
+                yield self._write_conn.cursor()
+            return
+        conn = self._read_pool.get()
+        try:
+            yield conn.cursor()
+        finally:
+            self._read_pool.put(conn)
+
+    def _maintain(self):
+        """Refresh planner statistics and bound on-disk WAL growth"""
+        with self._write_lock:
+            self._write_conn.execute('PRAGMA optimize')
+            if self.db_path != ':memory:':
+                self._write_conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def close(self):
+        """Close all database connections"""
+        if self._log_flush_timer is not None:
+            self._log_flush_timer.cancel()
+            self._log_flush_timer = None
+        self.flush_logs()
+        if self._ndjson_file is not None:
+            try:
+                self._ndjson_file.close()
+            except Exception:
+                pass
+            self._ndjson_file = None
+        if self._write_conn is not None:
+            try:
+                self._maintain()
+            except Exception:
+                pass  # Best effort on shutdown
+            # Memory mode: persist the working database back to disk
+            if self.persist_path:
+                try:
+                    disk_conn = sqlite3.connect(self.persist_path, timeout=10.0)
+                    try:
+                        with self._write_lock:
+                            self._write_conn.backup(disk_conn)
+                    finally:
+                        disk_conn.close()
+                    self.logger.info(f"Persisted database snapshot to {self.persist_path}")
+                except Exception as e:
+                    self.logger.error(f"Failed to persist database snapshot: {e}")
+        if self._read_pool is not None:
+            while not self._read_pool.empty():
+                try:
+                    self._read_pool.get_nowait().close()
+                except queue.Empty:
+                    break
+            self._read_pool = None
+        if self._write_conn is not None:
+            self._write_conn.close()
+            self._write_conn = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
     
     def add_directory(self, name: str, full_path: str, image_count: int = 0, 
                      file_size_mb: float = 0.0) -> int:
@@ -86,42 +527,35 @@ class ProcessingDatabase:
             Directory ID
         """
         try:
-            with sqlite3.connect(self.db_path, timeout=10.0) as conn:
-                cursor = conn.cursor()
-                
-                # Check if directory already exists
-                cursor.execute('SELECT id, status FROM directories WHERE name = ?', (name,))
-                existing = cursor.fetchone()
-                
-                if existing:
-                    # Update existing directory
-                    dir_id, current_status = existing
-                    cursor.execute('''
-                        UPDATE directories 
-                        SET full_path = ?, image_count = ?, file_size_mb = ?, updated_at = CURRENT_TIMESTAMP
-                        WHERE id = ?
-                    ''', (full_path, image_count, file_size_mb, dir_id))
-                    
-                    self.add_log_entry(dir_id, "directory_updated", 
-                                     f"Updated: {image_count} images, {file_size_mb:.1f} MB")
+            with self._write_cursor() as cursor:
+                # Stored as integer kilobytes; MB is the API unit
+                params = (name, full_path, image_count,
+                          int(round(file_size_mb * 1024)))
+
+                if _HAS_RETURNING:
+                    # One statement: insert or update, and learn the id plus
+                    # whether the row is new in the same round trip
+                    cursor.execute(_DIR_UPSERT_RETURNING_SQL, params)
+                    dir_id, inserted = cursor.fetchone()
                 else:
-                    # Insert new directory
-                    cursor.execute('''
-                        INSERT INTO directories (name, full_path, image_count, file_size_mb)
-                        VALUES (?, ?, ?, ?)
-                    ''', (name, full_path, image_count, file_size_mb))
-                    
-                    dir_id = cursor.lastrowid
-                    self.add_log_entry(dir_id, "directory_added", 
+                    cursor.execute('SELECT id FROM directories WHERE name = ?', (name,))
+                    existing = cursor.fetchone()
+                    cursor.execute(_DIR_UPSERT_SQL, params)
+                    inserted = existing is None
+                    dir_id = existing[0] if existing else cursor.lastrowid
+
+                if inserted:
+                    self.add_log_entry(dir_id, "directory_added",
                                      f"Added: {image_count} images, {file_size_mb:.1f} MB")
-                
-                conn.commit()
+                else:
+                    self.add_log_entry(dir_id, "directory_updated",
+                                     f"Updated: {image_count} images, {file_size_mb:.1f} MB")
+
                 return dir_id
-                
+
         except Exception as e:
             self.logger.error(f"Failed to add directory {name}: {e}")
             raise
-    
     def update_directory_status(self, name: str, status: str, 
                               error_message: str = None, 
                               processing_time: int = 0,
@@ -137,21 +571,20 @@ class ProcessingDatabase:
             has_exposure_correction: Whether exposure correction was applied
         """
         try:
-            with sqlite3.connect(self.db_path, timeout=10.0) as conn:
-                cursor = conn.cursor()
-                
-                processed_at = datetime.now().isoformat() if status == 'completed' else None
-                
-                cursor.execute('''
-                    UPDATE directories 
-                    SET status = ?, error_message = ?, updated_at = CURRENT_TIMESTAMP,
-                        processed_at = ?, processing_time_seconds = ?, has_exposure_correction = ?
-                    WHERE name = ?
-                ''', (status, error_message, processed_at, processing_time, has_exposure_correction, name))
-                
-                # Get directory ID for logging
-                cursor.execute('SELECT id FROM directories WHERE name = ?', (name,))
-                result = cursor.fetchone()
+            status_code = _STATUS_CODES[status]
+
+            with self._write_cursor() as cursor:
+                sql = _STATUS_UPDATE_RETURNING_SQL if _HAS_RETURNING else _STATUS_UPDATE_SQL
+                cursor.execute(sql, (status_code, error_message, status_code,
+                                     processing_time, has_exposure_correction, name))
+
+                if _HAS_RETURNING:
+                    result = cursor.fetchone()
+                else:
+                    # Older SQLite: separate lookup for the id used in logging
+                    cursor.execute('SELECT id FROM directories WHERE name = ?', (name,))
+                    result = cursor.fetchone()
+
                 if result:
                     dir_id = result[0]
                     log_message = f"Status changed to: {status}"
@@ -159,29 +592,120 @@ class ProcessingDatabase:
                         log_message += f" - Error: {error_message}"
                     if processing_time > 0:
                         log_message += f" - Time: {processing_time}s"
-                    
+
                     self.add_log_entry(dir_id, "status_changed", log_message)
-                
-                conn.commit()
-                
+
+            # Status transitions are the interesting audit events; make sure
+            # they are durable before returning
+            self.flush_logs()
+
         except Exception as e:
             self.logger.error(f"Failed to update status for {name}: {e}")
             raise
-    
-    def add_log_entry(self, directory_id: int, action: str, message: str = None):
-        """Add a log entry for a directory"""
+
+    def update_directory_statuses(self, names, status: str):
+        """
+        Update many directories to the same status in one transaction
+
+        One BEGIN/COMMIT (and so one fsync) covers the whole batch,
+        instead of a commit per directory as repeated
+        update_directory_status calls would incur.
+
+        Args:
+            names: Iterable of directory names
+            status: New status applied to every named directory
+        """
+        names = list(names)
+        if not names:
+            return
+
         try:
-            with sqlite3.connect(self.db_path, timeout=10.0) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO processing_log (directory_id, action, message)
-                    VALUES (?, ?, ?)
-                ''', (directory_id, action, message))
-                conn.commit()
-                
+            status_code = _STATUS_CODES[status]
+
+            with self._write_cursor() as cursor:
+                cursor.executemany(
+                    _STATUS_UPDATE_SQL,
+                    [(status_code, None, status_code, 0, False, name)
+                     for name in names])
+
+                # Audit entries for the rows that actually exist
+                placeholders = ','.join('?' * len(names))
+                cursor.execute(
+                    f'SELECT id FROM directories WHERE name IN ({placeholders})',
+                    names)
+                for (dir_id,) in cursor.fetchall():
+                    self.add_log_entry(dir_id, "status_changed",
+                                       f"Status changed to: {status}")
+
+            self.flush_logs()
+
         except Exception as e:
+            self.logger.error(f"Failed to bulk update status to {status}: {e}")
+            raise
+
+    def add_log_entry(self, directory_id: int, action: str, message: str = None):
+        """Record a log entry for a directory
+
+        Goes to the buffered processing_log table when log_to_db is set,
+        otherwise to the append-only NDJSON sidecar (SQLite b-tree pages are
+        a poor fit for a write-only audit trail).
+        """
+        timestamp = datetime.now().isoformat(sep=' ')
+
+        if not self.log_to_db:
+            try:
+                with self._ndjson_lock:
+                    if self._ndjson_file is None:
+                        self._ndjson_file = open(self._ndjson_path, 'a')
+                    self._ndjson_file.write(json.dumps({
+                        'directory_id': directory_id,
+                        'action': action,
+                        'message': message,
+                        'timestamp': timestamp
+                    }) + '\n')
+            except Exception:
+                # Don't log database errors to avoid recursion
+                pass
+            return
+
+        # Timestamp captured now so ordering is preserved even when the
+        # flush happens later
+        self._log_buf.append((directory_id, action, message, timestamp))
+        if len(self._log_buf) >= self.LOG_FLUSH_THRESHOLD:
+            self.flush_logs()
+
+    def flush_logs(self):
+        """Flush buffered log entries to their backing store"""
+        if self._ndjson_file is not None:
+            try:
+                with self._ndjson_lock:
+                    self._ndjson_file.flush()
+            except Exception:
+                pass
+        if not self._log_buf:
+            return
+        try:
+            with self._write_cursor() as cursor:
+                rows = []
+                while self._log_buf:
+                    rows.append(self._log_buf.popleft())
+                cursor.executemany(_LOG_INSERT_SQL, rows)
+
+        except Exception:
             # Don't log database errors to avoid recursion
             pass
+
+    def _schedule_log_flush(self):
+        """(Re)arm the background timer that flushes buffered log entries"""
+        self._log_flush_timer = threading.Timer(self.LOG_FLUSH_INTERVAL,
+                                                self._timed_log_flush)
+        self._log_flush_timer.daemon = True
+        self._log_flush_timer.start()
+
+    def _timed_log_flush(self):
+        self.flush_logs()
+        if self._write_conn is not None:
+            self._schedule_log_flush()
     
     def get_directories_by_status(self, status: str) -> List[Dict]:
         """
@@ -194,23 +718,23 @@ class ProcessingDatabase:
             List of directory dictionaries
         """
         try:
-            with sqlite3.connect(self.db_path, timeout=10.0) as conn:
-                cursor = conn.cursor()
+            with self._read_cursor() as cursor:
                 cursor.execute('''
-                    SELECT id, name, full_path, status, image_count, created_at, 
+                    SELECT id, name, full_path, status, image_count, created_at,
                            updated_at, processed_at, error_message, processing_time_seconds,
-                           file_size_mb, has_exposure_correction
-                    FROM directories 
+                           file_size_kb, has_exposure_correction
+                    FROM directories
                     WHERE status = ?
                     ORDER BY created_at
-                ''', (status,))
-                
-                columns = ['id', 'name', 'full_path', 'status', 'image_count', 'created_at',
-                          'updated_at', 'processed_at', 'error_message', 'processing_time_seconds',
-                          'file_size_mb', 'has_exposure_correction']
-                
-                return [dict(zip(columns, row)) for row in cursor.fetchall()]
-                
+                ''', (_STATUS_CODES[status],))
+
+                cursor.arraysize = 200
+                results = [dict(row) for row in cursor]
+                for result in results:
+                    result['status'] = status
+                    result['file_size_mb'] = result.pop('file_size_kb') / 1024
+                return results
+
         except Exception as e:
             self.logger.error(f"Failed to get directories by status {status}: {e}")
             return []
@@ -234,54 +758,47 @@ class ProcessingDatabase:
     def get_processing_stats(self) -> Dict:
         """Get overall processing statistics"""
         try:
-            with sqlite3.connect(self.db_path, timeout=10.0) as conn:
-                cursor = conn.cursor()
-                
-                # Get counts by status
+            with self._read_cursor() as cursor:
+                # One pass over the table with conditional aggregates instead
+                # of four queries plus a Python-side scan of completed rows
                 cursor.execute('''
-                    SELECT status, COUNT(*) as count
+                    SELECT status,
+                           COUNT(*),
+                           SUM(processing_time_seconds),
+                           SUM(CASE WHEN processing_time_seconds > 0 THEN 1 ELSE 0 END),
+                           SUM(image_count),
+                           SUM(file_size_kb),
+                           SUM(CASE WHEN has_exposure_correction THEN 1 ELSE 0 END)
                     FROM directories
                     GROUP BY status
                 ''')
-                status_counts = dict(cursor.fetchall())
-                
-                # Get total processing time
-                cursor.execute('''
-                    SELECT SUM(processing_time_seconds) as total_time,
-                           AVG(processing_time_seconds) as avg_time
-                    FROM directories
-                    WHERE status = 'completed' AND processing_time_seconds > 0
-                ''')
-                time_stats = cursor.fetchone()
-                total_time, avg_time = time_stats if time_stats else (0, 0)
-                
-                # Get total images processed
-                cursor.execute('''
-                    SELECT SUM(image_count) as total_images
-                    FROM directories
-                    WHERE status = 'completed'
-                ''')
-                total_images = cursor.fetchone()[0] or 0
-                
-                # Get total file size
-                cursor.execute('''
-                    SELECT SUM(file_size_mb) as total_size
-                    FROM directories
-                ''')
-                total_size = cursor.fetchone()[0] or 0
-                
+
+                status_counts = {}
+                total_time = 0
+                timed_count = 0
+                total_images = 0
+                total_size = 0
+                exposure_corrected = 0
+
+                for (status_code, count, time_sum, timed, images, size, corrected) in cursor.fetchall():
+                    status = _STATUS_NAMES.get(status_code, status_code)
+                    status_counts[status] = count
+                    total_size += size or 0
+                    if status == 'completed':
+                        total_time = time_sum or 0
+                        timed_count = timed or 0
+                        total_images = images or 0
+                        exposure_corrected = corrected or 0
+
                 return {
                     'status_counts': status_counts,
-                    'total_processing_time': total_time or 0,
-                    'average_processing_time': avg_time or 0,
+                    'total_processing_time': total_time,
+                    'average_processing_time': (total_time / timed_count) if timed_count else 0,
                     'total_images_processed': total_images,
-                    'total_file_size_mb': total_size,
-                    'directories_with_exposure_correction': len([
-                        d for d in self.get_completed_directories() 
-                        if d.get('has_exposure_correction')
-                    ])
+                    'total_file_size_mb': total_size / 1024,
+                    'directories_with_exposure_correction': exposure_corrected
                 }
-                
+
         except Exception as e:
             self.logger.error(f"Failed to get processing stats: {e}")
             return {}
@@ -295,47 +812,43 @@ class ProcessingDatabase:
             directory_names: Specific directories to reset, or None for all 'processing' status
         """
         try:
-            with sqlite3.connect(self.db_path, timeout=10.0) as conn:
-                cursor = conn.cursor()
-                
+            with self._write_cursor() as cursor:
                 if directory_names:
                     placeholders = ','.join(['?' for _ in directory_names])
                     cursor.execute(f'''
-                        UPDATE directories 
-                        SET status = 'pending', updated_at = CURRENT_TIMESTAMP
-                        WHERE name IN ({placeholders}) AND status = 'processing'
+                        UPDATE directories
+                        SET status = 0, updated_at = CURRENT_TIMESTAMP
+                        WHERE name IN ({placeholders}) AND status = 1
                     ''', directory_names)
                 else:
                     cursor.execute('''
-                        UPDATE directories 
-                        SET status = 'pending', updated_at = CURRENT_TIMESTAMP
-                        WHERE status = 'processing'
+                        UPDATE directories
+                        SET status = 0, updated_at = CURRENT_TIMESTAMP
+                        WHERE status = 1
                     ''')
-                
+
                 rows_affected = cursor.rowcount
-                conn.commit()
-                
-                self.logger.info(f"Reset {rows_affected} directories from 'processing' to 'pending'")
-                return rows_affected
-                
+
+            self.logger.info(f"Reset {rows_affected} directories from 'processing' to 'pending'")
+            return rows_affected
+
         except Exception as e:
             self.logger.error(f"Failed to reset processing status: {e}")
             return 0
     
     def get_directory_history(self, name: str) -> List[Dict]:
         """Get processing history for a specific directory"""
+        self.flush_logs()
         try:
-            with sqlite3.connect(self.db_path, timeout=10.0) as conn:
-                cursor = conn.cursor()
-                
+            with self._read_cursor() as cursor:
                 # Get directory ID
                 cursor.execute('SELECT id FROM directories WHERE name = ?', (name,))
                 result = cursor.fetchone()
                 if not result:
                     return []
-                
+
                 dir_id = result[0]
-                
+
                 # Get log entries
                 cursor.execute('''
                     SELECT action, message, timestamp
@@ -343,10 +856,26 @@ class ProcessingDatabase:
                     WHERE directory_id = ?
                     ORDER BY timestamp DESC
                 ''', (dir_id,))
-                
-                columns = ['action', 'message', 'timestamp']
-                return [dict(zip(columns, row)) for row in cursor.fetchall()]
-                
+
+                cursor.arraysize = 200
+                entries = [dict(row) for row in cursor]
+
+            # Merge in the NDJSON sidecar entries (the default log store)
+            if self._ndjson_path and os.path.exists(self._ndjson_path):
+                with open(self._ndjson_path) as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue  # Torn tail line from a crashed run
+                        if record.get('directory_id') == dir_id:
+                            entries.append({'action': record.get('action'),
+                                            'message': record.get('message'),
+                                            'timestamp': record.get('timestamp')})
+
+            entries.sort(key=lambda e: e['timestamp'] or '', reverse=True)
+            return entries
+
         except Exception as e:
             self.logger.error(f"Failed to get directory history for {name}: {e}")
             return []
@@ -354,64 +883,95 @@ class ProcessingDatabase:
     def cleanup_old_entries(self, days_old: int = 30):
         """Remove entries older than specified days for completed/failed directories"""
         try:
-            with sqlite3.connect(self.db_path, timeout=10.0) as conn:
-                cursor = conn.cursor()
-                
-                # Remove old completed/failed directories
+            cutoff = (f'-{int(days_old)} days',)
+
+            with self._write_cursor() as cursor:
+                # Log entries go first: with foreign keys enforced, deleting
+                # a directory that still has log rows would fail
+                cursor.execute('''
+                    DELETE FROM processing_log
+                    WHERE directory_id IN (
+                        SELECT id FROM directories
+                        WHERE status IN (2, 3)
+                        AND updated_at < datetime('now', ?)
+                    )
+                ''', cutoff)
+
+                # Remove old completed/failed directories; the cutoff is a
+                # bound parameter so the statement compiles once regardless
+                # of days_old
                 cursor.execute('''
                     DELETE FROM directories
-                    WHERE status IN ('completed', 'failed') 
-                    AND updated_at < datetime('now', '-{} days')
-                '''.format(days_old))
-                
+                    WHERE status IN (2, 3)
+                    AND updated_at < datetime('now', ?)
+                ''', cutoff)
+
                 rows_affected = cursor.rowcount
-                conn.commit()
-                
-                self.logger.info(f"Cleaned up {rows_affected} old directory entries")
-                return rows_affected
-                
+
+                # Drop any log entries already orphaned for other reasons so
+                # the log table doesn't grow without bound
+                cursor.execute('''
+                    DELETE FROM processing_log
+                    WHERE directory_id NOT IN (SELECT id FROM directories)
+                ''')
+
+            self._maintain()
+
+            self.logger.info(f"Cleaned up {rows_affected} old directory entries")
+            return rows_affected
+
         except Exception as e:
             self.logger.error(f"Failed to cleanup old entries: {e}")
             return 0
     
+    def _export_table(self, cursor, f, table: str, order_by: str, json_module):
+        """Stream one table into an open JSON array, row by row"""
+        cursor.execute(f'SELECT * FROM {table} ORDER BY {order_by}')
+        first = True
+        for row in cursor:
+            if not first:
+                f.write(',\n')
+            record = dict(row)
+            if 'status' in record:
+                # Export status names rather than internal integer codes
+                record['status'] = _STATUS_NAMES.get(record['status'], record['status'])
+            if 'file_size_kb' in record:
+                # Export in MB, matching the public API unit
+                record['file_size_mb'] = record.pop('file_size_kb') / 1024
+            f.write('    ' + json_module.dumps(record))
+            first = False
+
     def export_to_json(self, output_file: str):
         """Export database to JSON for backup"""
         try:
             import json
-            
-            with sqlite3.connect(self.db_path, timeout=10.0) as conn:
-                cursor = conn.cursor()
-                
-                # Get all directories
-                cursor.execute('''
-                    SELECT * FROM directories ORDER BY created_at
-                ''')
-                directories = cursor.fetchall()
-                
-                # Get column names
-                cursor.execute('PRAGMA table_info(directories)')
-                dir_columns = [column[1] for column in cursor.fetchall()]
-                
-                # Get all logs
-                cursor.execute('''
-                    SELECT * FROM processing_log ORDER BY timestamp
-                ''')
-                logs = cursor.fetchall()
-                
-                cursor.execute('PRAGMA table_info(processing_log)')
-                log_columns = [column[1] for column in cursor.fetchall()]
-                
-                export_data = {
-                    'directories': [dict(zip(dir_columns, row)) for row in directories],
-                    'processing_log': [dict(zip(log_columns, row)) for row in logs],
-                    'export_timestamp': datetime.now().isoformat()
-                }
-                
+
+            self.flush_logs()
+
+            # Export from a point-in-time snapshot so a long dump never
+            # blocks (or is torn by) concurrent status updates
+            snapshot = sqlite3.connect(':memory:')
+            snapshot.row_factory = sqlite3.Row
+            with self._write_lock:
+                self._write_conn.backup(snapshot)
+
+            # Rows are streamed straight into the file instead of being
+            # materialized as lists of dicts first, keeping memory flat no
+            # matter how large the history grows
+            try:
+                cursor = snapshot.cursor()
                 with open(output_file, 'w') as f:
-                    json.dump(export_data, f, indent=2)
-                
-                self.logger.info(f"Database exported to {output_file}")
-                
+                    f.write('{\n  "directories": [\n')
+                    self._export_table(cursor, f, 'directories', 'created_at', json)
+                    f.write('\n  ],\n  "processing_log": [\n')
+                    self._export_table(cursor, f, 'processing_log', 'timestamp', json)
+                    f.write('\n  ],\n  "export_timestamp": %s\n}\n'
+                            % json.dumps(datetime.now().isoformat()))
+            finally:
+                snapshot.close()
+
+            self.logger.info(f"Database exported to {output_file}")
+
         except Exception as e:
             self.logger.error(f"Failed to export database: {e}")
-            raise 
\ No newline at end of file
+            raise
\ No newline at end of file
@@ -1,19 +1,434 @@
 #!/usr/bin/env python3
+import atexit
 import os
 import sys
 import json
+import functools
 import subprocess
+import tempfile
 import logging
+import logging.handlers
+import queue
 import time
 import shutil
+from collections import deque
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Set
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock
+from typing import Dict, List, Optional, Set
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from threading import Event, Lock, Thread, Timer, get_ident
 import argparse
+from PIL import Image, ImageChops, ImageStat
 from database import ProcessingDatabase
 
+# orjson serializes several times faster than the stdlib; fall back
+# silently when it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# watchdog turns the pending-queue monitor from a fixed-interval poll
+# into an event-driven wait; without it the sleep loop still works
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+# Lowercased suffixes accepted as photos; a tuple so str.endswith checks
+# all of them in one C-level call
+_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.tiff', '.bmp', '.raw')
+
+# Checkpoint keys held as sets in memory (O(1) membership tests) and
+# serialized as sorted lists
+_CHECKPOINT_SET_KEYS = ('processed', 'failed', 'queued', 'exposure_corrected')
+
+# Per-directory record of exported models, written next to the outputs;
+# lets repeat runs skip the multi-hour CLI when the exports still match
+_MANIFEST_NAME = '.morfi-manifest.json'
+
+# Log banner separator, built once instead of per log call
+_SEP = '=' * 60
+
+# Exit codes that signal a systemic CLI failure (license unavailable,
+# GPU initialization) rather than a problem with one dataset — retrying
+# the next directory would just burn another multi-hour run on the same
+# error
+_FATAL_RETURN_CODES = frozenset({16, 32})
+
+class RealityCaptureFatalError(Exception):
+    """The CLI failed in a way no other directory can succeed after"""
+
+class _PendingImageHandler(FileSystemEventHandler):
+    """Wakes the queue monitor as soon as an image lands in a watched dir
+
+    Readiness is still decided by process_pending_queue; the handler only
+    cuts the wait short, so a spurious or non-image event at worst costs
+    one extra (cheap, cached) queue evaluation.
+    """
+
+    def __init__(self, wake_event: Event):
+        self._wake = wake_event
+
+    def on_created(self, event):
+        if not event.is_directory and \
+                event.src_path.lower().endswith(_IMAGE_EXTENSIONS):
+            self._wake.set()
+
+    def on_moved(self, event):
+        # Copy tools often write to a temp name and rename into place
+        if not event.is_directory and \
+                event.dest_path.lower().endswith(_IMAGE_EXTENSIONS):
+            self._wake.set()
+
+class MagickDaemon:
+    """A persistent ImageMagick process fed one command per line over stdin
+
+    Spawning magick per image pays process creation plus ImageMagick startup
+    (delegate/config loading) for every call. 'magick -script -' keeps a
+    single process alive and executes commands as they arrive, so each
+    analysis or correction costs only a pipe round-trip.
+    """
+
+    # Per-command deadline, matching the timeout the one-shot
+    # subprocess.run calls carried before the daemon existed
+    REPLY_TIMEOUT = 60
+
+    def __init__(self, magick_path: str = "magick"):
+        self.process = subprocess.Popen(
+            [magick_path, '-script', '-'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True
+        )
+
+    def run(self, command: str) -> str:
+        """Execute one script line and return the line it prints
+
+        Commands must end with an operation that writes exactly one line to
+        stdout (e.g. -format "...\\n" info:) so the reply can be read back
+        without blocking. A command that stalls past REPLY_TIMEOUT gets the
+        daemon killed — readline() then returns EOF, the RuntimeError below
+        fires, and the caller's discard-and-respawn path takes over — so one
+        bad image cannot wedge its worker indefinitely.
+        """
+        if self.process.poll() is not None:
+            raise RuntimeError("magick daemon has exited")
+        timed_out = Event()
+
+        def _kill_stalled():
+            timed_out.set()
+            self.process.kill()
+
+        watchdog = Timer(self.REPLY_TIMEOUT, _kill_stalled)
+        watchdog.start()
+        try:
+            self.process.stdin.write(command.rstrip('\n') + '\n')
+            self.process.stdin.flush()
+            line = self.process.stdout.readline()
+        finally:
+            watchdog.cancel()
+        if not line:
+            if timed_out.is_set():
+                raise RuntimeError(
+                    f"magick daemon gave no reply within {self.REPLY_TIMEOUT}s")
+            raise RuntimeError("magick daemon closed its output")
+        return line.strip()
+
+    def close(self):
+        """Terminate the daemon process"""
+        try:
+            if self.process.poll() is None:
+                self.process.stdin.close()
+                self.process.wait(timeout=5)
+        except Exception:
+            self.process.kill()
+
+@functools.lru_cache(maxsize=256)
+def _scan_image_files(dir_str: str, mtime: float) -> tuple:
+    """Sorted image files in a directory, memoized on the directory mtime
+
+    The mtime argument exists purely as a cache key: a directory whose
+    contents changed gets a new mtime and therefore a fresh scan, while
+    repeated listings of an unchanged directory are served from the cache.
+
+    scandir's DirEntry carries file type info from the directory read
+    itself, so no per-file stat() calls are needed.
+    """
+    with os.scandir(dir_str) as entries:
+        return tuple(sorted(Path(entry.path) for entry in entries
+                            if entry.is_file(follow_symlinks=False)
+                            and entry.name.lower().endswith(_IMAGE_EXTENSIONS)))
+
+def _link_or_copy(src: Path, dst: Path):
+    """Populate dst with src's content, preferring a metadata-only hardlink
+
+    Images that need no correction only have to appear in the corrected
+    folder; hardlinking avoids rewriting tens of MB per image. Safe because
+    corrected output is always written to a fresh file, never through an
+    existing link. Falls back to a real copy on filesystems (or across
+    volumes) where linking fails.
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+def _measure_brightness(image_path: Path) -> tuple:
+    """Mean and max HSL lightness (%) of an image, decoded in-process
+
+    Matches the ImageMagick '-colorspace HSL -channel L' statistics:
+    L = (max(R,G,B) + min(R,G,B)) / 2, computed with Pillow's C-level
+    channel ops. A mean/max reduction does not warrant a subprocess, even
+    a pipelined one — this skips the pipe round-trip entirely.
+    """
+    with Image.open(image_path) as img:
+        # Brightness statistics are scale-invariant to within a fraction of
+        # a percent, so decode small: draft() lets libjpeg produce a 1/8
+        # scale image straight from the DCT coefficients, and thumbnail()
+        # bounds the reduction work for non-JPEG formats
+        img.draft('RGB', (512, 512))
+        img.thumbnail((256, 256))
+        r, g, b = img.convert('RGB').split()
+        hi = ImageChops.lighter(ImageChops.lighter(r, g), b)
+        lo = ImageChops.darker(ImageChops.darker(r, g), b)
+        lightness = ImageChops.add(hi, lo, scale=2)
+    mean_brightness = ImageStat.Stat(lightness).mean[0] * 100 / 255
+    max_brightness = lightness.getextrema()[1] * 100 / 255
+    return mean_brightness, max_brightness
+
+def _is_overexposed(mean_brightness: float, max_brightness: float) -> bool:
+    """Single definition of the overexposure threshold"""
+    return max_brightness > 95 or mean_brightness > 70
+
+def _analyze_image_task(image_path: str) -> tuple:
+    """Pool worker for the up-front batch analysis pass
+
+    Returns (path, (mean, max)) brightness percentages, or (path, (None,
+    None)) if the image could not be read.
+    """
+    try:
+        return image_path, _measure_brightness(Path(image_path))
+    except Exception:
+        return image_path, (None, None)
+
+def _hald_clut_path(daemon: MagickDaemon, adjustment: float) -> Optional[str]:
+    """Path to a HALD CLUT baking the color ops for one adjustment value
+
+    modulate, exposure multiply and sigmoidal-contrast are all pure
+    per-color mappings, so their composition can be captured once in a
+    HALD lookup table and applied as a single vectorized pass per image,
+    instead of three operator passes through the pixel cache. CLUTs are
+    generated lazily into the temp directory, one file per adjustment
+    value, and shared across worker processes via an atomic rename.
+
+    Returns None if generation fails; callers fall back to the full
+    operator chain.
+    """
+    clut = os.path.join(tempfile.gettempdir(),
+                        f'exposure_clut_{adjustment:+.2f}.png')
+    if os.path.exists(clut):
+        return clut
+    try:
+        tmp = f'{clut}.{os.getpid()}.tmp'
+        daemon.run(
+            'hald:8 '
+            '-modulate 100,110,100 '
+            f'-evaluate multiply {2**adjustment} '
+            '-sigmoidal-contrast 3,50% '
+            f'-write "{tmp}" -format "DONE\\n" info:'
+        )
+        os.replace(tmp, clut)
+        return clut
+    except Exception:
+        return None
+
+# Corrected output is always JPEG: RealityCapture ignores EXIF (so strip
+# it) and gains nothing from PNG's lossless encoding, which costs ~8x the
+# disk footprint and decode time. 4:2:0 subsampling plus optimized
+# Huffman coding roughly halves the file size at quality 92.
+_JPEG_SUFFIXES = ('.jpg', '.jpeg')
+_JPEG_WRITE_OPS = ('-strip -quality 92 -sampling-factor 4:2:0 '
+                   '-define jpeg:optimize-coding=true ')
+
+def _transcode_script(input_path: Path, output_path: Path) -> str:
+    """Magick script line re-encoding a well-exposed image as JPEG"""
+    return (
+        '-limit thread 1 -limit memory 512MB -limit map 1GB '
+        f'"{input_path}" '
+        + _JPEG_WRITE_OPS +
+        f'-write "{output_path}" -format "DONE\\n" info:'
+    )
+
+def _correct_script(input_path: Path, output_path: Path, adjustment: float,
+                    clut_path: Optional[str] = None,
+                    sharpen: bool = False) -> str:
+    """Magick script line correcting exposure and reporting the new mean
+
+    Also includes highlight recovery and shadow enhancement. The trailing
+    -format/info: doubles as the completion sentinel.
+
+    The worker pool already keeps every core busy with one magick process
+    each, so ImageMagick's internal OpenMP threading is pinned to 1 —
+    letting each process spawn its own thread team just oversubscribes the
+    CPU — and memory is bounded so max_workers concurrent corrections
+    cannot swap.
+    """
+    if clut_path:
+        # Precomposed color mapping: one lookup pass instead of three
+        color_ops = f'"{clut_path}" -hald-clut '
+    else:
+        color_ops = (
+            '-modulate 100,110,100 '          # Slightly increase saturation
+            f'-evaluate multiply {2**adjustment} '  # Exposure adjustment
+            '-sigmoidal-contrast 3,50% '      # Reduce highlights, enhance midtones
+        )
+    # Sharpening is opt-in: the convolution is the most expensive operator
+    # in the chain, and photogrammetry tools do their own feature-scale
+    # detection, where sharpening halos can even create false features
+    sharpen_op = '-unsharp 0x1 ' if sharpen else ''
+    return (
+        '-limit thread 1 -limit memory 512MB -limit map 1GB '
+        f'"{input_path}" '
+        + color_ops +
+        '-auto-level '                    # Auto-adjust levels
+        + sharpen_op
+        + _JPEG_WRITE_OPS +
+        f'-write "{output_path}" '
+        '-colorspace HSL -channel L '
+        '-format "%[fx:mean*100]\\n" info:'
+    )
+
+# Each pool worker process owns exactly one persistent magick daemon
+_worker_daemon = None
+
+def _worker_magick_daemon(magick_path: str) -> MagickDaemon:
+    """Get (or spawn) this worker process's persistent magick daemon"""
+    global _worker_daemon
+    if _worker_daemon is None or _worker_daemon.process.poll() is not None:
+        _worker_daemon = MagickDaemon(magick_path)
+    return _worker_daemon
+
+def _discard_worker_daemon():
+    """Drop this worker's daemon so the next task spawns a fresh one"""
+    global _worker_daemon
+    if _worker_daemon is not None:
+        _worker_daemon.close()
+        _worker_daemon = None
+
+def process_single_image(task_data: Dict) -> Dict:
+    """
+    Process a single image for exposure correction (process pool worker)
+
+    Module-level and free of automator state so it pickles cleanly for
+    ProcessPoolExecutor: everything it needs arrives in task_data, and
+    anything worth logging goes back to the parent in result['log'].
+
+    Args:
+        task_data: Dict containing image processing information
+
+    Returns:
+        Dict with processing results
+    """
+    image_file = Path(task_data['image_path'])
+    output_file = Path(task_data['output_path'])
+    adjustment = task_data['adjustment']
+    magick_path = task_data['magick_path']
+    task_id = task_data['task_id']
+
+    result = {
+        'task_id': task_id,
+        'image_name': image_file.name,
+        'success': False,
+        'was_overexposed': False,
+        'corrected': False,
+        'brightness_before': 0,
+        'brightness_after': 0,
+        'cached': False,
+        'log': []
+    }
+
+    # Fast path: output from a previous run that is at least as new as the
+    # input is already correct — no decode, no magick
+    try:
+        if output_file != image_file and \
+                output_file.stat().st_mtime >= image_file.stat().st_mtime:
+            result['success'] = True
+            result['cached'] = True
+            return result
+    except OSError:
+        pass  # No output yet; process normally
+
+    try:
+        # Use the batch pass's analysis when the parent supplied it
+        if 'mean_brightness' in task_data:
+            mean_brightness = task_data['mean_brightness']
+            is_overexposed = _is_overexposed(mean_brightness, task_data['max_brightness'])
+        else:
+            try:
+                mean_brightness, max_brightness = _measure_brightness(image_file)
+                is_overexposed = _is_overexposed(mean_brightness, max_brightness)
+            except Exception as e:
+                result['log'].append(('warning', f"Error analyzing exposure for {image_file.name}: {e}"))
+                mean_brightness, is_overexposed = 50, False
+
+        result['brightness_before'] = mean_brightness
+        result['was_overexposed'] = is_overexposed
+
+        if is_overexposed:
+            # Correct and measure in one pipeline (no re-decode of the output)
+            try:
+                daemon = _worker_magick_daemon(magick_path)
+                clut_path = _hald_clut_path(daemon, adjustment)
+                brightness_after = float(daemon.run(
+                    _correct_script(image_file, output_file, adjustment, clut_path,
+                                    sharpen=task_data.get('sharpen', False))))
+            except Exception:
+                _discard_worker_daemon()
+                brightness_after = None
+
+            if brightness_after is not None:
+                result['corrected'] = True
+                result['success'] = True
+                result['brightness_after'] = brightness_after
+                result['log'].append(('info', f"[OK] Worker {task_id}: Corrected {image_file.name} ({mean_brightness:.1f}% -> {brightness_after:.1f}%)"))
+            else:
+                # Keep the original if correction failed
+                if not output_file.exists():
+                    _link_or_copy(image_file, output_file)
+                result['success'] = True  # Still successful, just not corrected
+                result['log'].append(('error', f"[FAIL] Worker {task_id}: Failed to correct {image_file.name}, using original"))
+        else:
+            # Image is not overexposed: JPEG inputs link straight across,
+            # anything else gets re-encoded as JPEG so the corrected
+            # directory stays uniform (and ~8x smaller than PNG)
+            if not output_file.exists():
+                if image_file.suffix.lower() in _JPEG_SUFFIXES:
+                    _link_or_copy(image_file, output_file)
+                else:
+                    try:
+                        daemon = _worker_magick_daemon(magick_path)
+                        daemon.run(_transcode_script(image_file, output_file))
+                    except Exception:
+                        _discard_worker_daemon()
+                        _link_or_copy(image_file, output_file)
+            result['success'] = True
+
+    except Exception as e:
+        result['log'].append(('error', f"[ERROR] Worker {task_id}: Error processing {image_file.name}: {e}"))
+        # Try to keep the original as fallback
+        try:
+            if not output_file.exists():
+                _link_or_copy(image_file, output_file)
+            result['success'] = True
+        except Exception as copy_error:
+            result['log'].append(('error', f"[ERROR] Worker {task_id}: Failed to copy {image_file.name}: {copy_error}"))
+
+    return result
+
 class PhotogrammetryAutomator:
     def __init__(self, 
                  input_dir: str, 
@@ -28,7 +443,11 @@ class PhotogrammetryAutomator:
                  imagemagick_path: str = "magick",
                  exposure_adjustment: float = -0.5,
                  keep_originals: bool = True,
-                 max_workers: int = 4):
+                 max_workers: int = 4,
+                 enable_sharpening: bool = False,
+                 max_cli_workers: int = 1,
+                 gpu_ids: Optional[List[int]] = None,
+                 license_slots: Optional[int] = None):
         """
         Initialize the photogrammetry automation system
         
@@ -46,6 +465,18 @@ class PhotogrammetryAutomator:
             exposure_adjustment: Exposure adjustment (-2.0 to +2.0, negative = darker)
             keep_originals: Whether to keep original photos alongside corrected ones
             max_workers: Number of parallel threads for image processing (default: 4)
+            enable_sharpening: Apply -unsharp to corrected images. Off by
+                default: RealityCapture/RealityScan derive their own
+                feature scales, and the convolution dominates correction
+                cost while sharpening halos can create false features
+            max_cli_workers: Number of RealityCapture/RealityScan jobs to
+                run concurrently (default: 1). Raise only if the GPU and
+                license allow multiple simultaneous reconstructions
+            gpu_ids: GPU device ids to spread CLI jobs over; each job
+                gets one exclusively via CUDA_VISIBLE_DEVICES. Also caps
+                max_cli_workers at the number of ids
+            license_slots: Cap on concurrent CLI jobs the license
+                allows; clamps max_cli_workers
         """
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
@@ -59,10 +490,41 @@ class PhotogrammetryAutomator:
         self.exposure_adjustment = exposure_adjustment
         self.keep_originals = keep_originals
         self.max_workers = max_workers
-        
+        self.enable_sharpening = enable_sharpening
+        self.max_cli_workers = max_cli_workers
+
+        # Keep CLI concurrency at the true hardware/license limit: the
+        # thread pool is the single dispatch point, so clamping its size
+        # is the whole scheduler. Each running job checks a GPU id out of
+        # the deque and returns it when done
+        self.gpu_ids = list(gpu_ids) if gpu_ids else None
+        if self.gpu_ids:
+            self.max_cli_workers = min(self.max_cli_workers, len(self.gpu_ids))
+        if license_slots:
+            self.max_cli_workers = min(self.max_cli_workers, license_slots)
+        self._gpu_pool = deque(self.gpu_ids) if self.gpu_ids else None
+
+
         # Thread safety
         self.log_lock = Lock()
-        self.progress_lock = Lock()
+        self.checkpoint_lock = Lock()
+
+        # Set when the CLI reports a systemic failure (license, GPU);
+        # run() stops dispatching new directories once it is non-None
+        self._fatal_error: Optional[RealityCaptureFatalError] = None
+
+        # Fraction (0.0-1.0) of the current batch that has finished.
+        # Plain float written from the dispatch loops and sampled by
+        # the UI at a low rate; no lock needed for a single writer
+        self.progress_fraction = 0.0
+
+        # Set whenever directory statuses are written so the UI can
+        # skip its post-run refresh when nothing actually changed
+        self.db_dirty = Event()
+
+        # Persistent magick processes, one per worker thread
+        self._magick_daemons = {}
+        self._magick_daemon_lock = Lock()
         
         # Detect software type
         if software_type == "auto":
@@ -91,9 +553,17 @@ class PhotogrammetryAutomator:
         
         # Migrate checkpoint data to database if needed
         self.migrate_checkpoint_to_database()
-        
-        # Queue for directories with insufficient images
-        self.pending_queue = []
+
+        # Checkpoint persistence happens off the processing path: saves
+        # enqueue a snapshot and a daemon thread coalesces bursts into
+        # one disk write (flush_checkpoint blocks until it drains)
+        self._checkpoint_queue = queue.Queue()
+        Thread(target=self._checkpoint_writer, daemon=True).start()
+
+
+        # Directories with insufficient images, keyed by name for O(1)
+        # lookup when the same directory is re-checked every poll
+        self.pending_queue: Dict[str, Dict] = {}
         
         self.logger.info(f"Initialized with {self.software_type.upper()} at {self.software_exe}")
         if self.enable_exposure_correction:
@@ -102,16 +572,32 @@ class PhotogrammetryAutomator:
             self.logger.info("Exposure correction disabled")
         
     def setup_logging(self):
-        """Setup logging configuration"""
-        log_format = '%(asctime)s - %(levelname)s - %(message)s'
-        logging.basicConfig(
-            level=logging.INFO,
-            format=log_format,
-            handlers=[
-                logging.FileHandler('photogrammetry_automation.log'),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
+        """Setup logging configuration
+
+        Records go through a QueueHandler: emitting costs one O(1)
+        enqueue, and a listener thread does the file/console writes, so
+        streamed CLI output and worker threads never block on disk I/O
+        or serialize on handler locks.
+        """
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        file_handler = logging.FileHandler('photogrammetry_automation.log')
+        stream_handler = logging.StreamHandler(sys.stdout)
+        file_handler.setFormatter(formatter)
+        stream_handler.setFormatter(formatter)
+
+        # SimpleQueue suffices: pool worker processes never log directly,
+        # they ship (level, message) tuples back for the parent to replay
+        log_queue = queue.SimpleQueue()
+        root_logger = logging.getLogger()
+        root_logger.setLevel(logging.INFO)
+        root_logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+
+        self._log_listener = logging.handlers.QueueListener(
+            log_queue, file_handler, stream_handler)
+        self._log_listener.start()
+        # Flush whatever is still queued when the process exits
+        atexit.register(self._log_listener.stop)
+
         self.logger = logging.getLogger(__name__)
         
     def load_checkpoint(self) -> Dict:
@@ -120,16 +606,20 @@ class PhotogrammetryAutomator:
             try:
                 with open(self.checkpoint_file, 'r') as f:
                     data = json.load(f)
-                    self.logger.info(f"Loaded checkpoint with {len(data.get('processed', []))} processed directories")
+                    # Membership checks against these run constantly during
+                    # discovery and queue polling; sets make them O(1)
+                    for key in _CHECKPOINT_SET_KEYS:
+                        data[key] = set(data.get(key, []))
+                    self.logger.info(f"Loaded checkpoint with {len(data['processed'])} processed directories")
                     return data
             except Exception as e:
                 self.logger.warning(f"Could not load checkpoint file: {e}")
-        
+
         return {
-            'processed': [],
-            'failed': [],
-            'queued': [],  # Directories waiting for more images
-            'exposure_corrected': [],  # Directories that have had exposure correction applied
+            'processed': set(),
+            'failed': set(),
+            'queued': set(),  # Directories waiting for more images
+            'exposure_corrected': set(),  # Directories that have had exposure correction applied
             'last_updated': None
         }
     
@@ -177,13 +667,62 @@ class PhotogrammetryAutomator:
             self.logger.error(f"Failed to migrate checkpoint data: {e}")
     
     def save_checkpoint(self):
-        """Save current progress to checkpoint file (legacy support)"""
-        self.checkpoint_data['last_updated'] = datetime.now().isoformat()
-        try:
-            with open(self.checkpoint_file, 'w') as f:
-                json.dump(self.checkpoint_data, f, indent=2)
-        except Exception as e:
-            self.logger.error(f"Failed to save checkpoint: {e}")
+        """Queue the current progress for the background checkpoint writer
+
+        Snapshotting is the only synchronous part; the JSON dump and the
+        rename land on disk from the writer thread, off the
+        directory-processing critical path.
+        """
+        # Serialized: concurrent CLI jobs finishing together must each
+        # snapshot a consistent view of the sets
+        with self.checkpoint_lock:
+            self.checkpoint_data['last_updated'] = datetime.now().isoformat()
+            # Materialize the in-memory sets as sorted lists for the file
+            snapshot = dict(self.checkpoint_data)
+            for key in _CHECKPOINT_SET_KEYS:
+                snapshot[key] = sorted(self.checkpoint_data.get(key, ()))
+        self._checkpoint_queue.put(snapshot)
+
+    def _checkpoint_writer(self):
+        """Daemon loop persisting checkpoint snapshots with coalescing
+
+        A burst of saves (several CLI jobs finishing together, the
+        per-image correction loop) collapses to a single write of the
+        newest snapshot, so the fsync/rename cost is paid once per burst
+        instead of once per save.
+        """
+        while True:
+            snapshot = self._checkpoint_queue.get()
+            pending = 1
+            time.sleep(0.2)  # Let a burst of saves accumulate
+            while True:
+                try:
+                    snapshot = self._checkpoint_queue.get_nowait()
+                    pending += 1
+                except queue.Empty:
+                    break
+
+            try:
+                if orjson is not None:
+                    data = orjson.dumps(snapshot, option=orjson.OPT_INDENT_2)
+                else:
+                    data = json.dumps(snapshot, indent=2).encode()
+
+                # Write-then-rename so a crash mid-write can never leave a
+                # torn checkpoint behind
+                tmp_file = self.checkpoint_file + '.tmp'
+                with open(tmp_file, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_file, self.checkpoint_file)
+            except Exception as e:
+                self.logger.error(f"Failed to save checkpoint: {e}")
+            finally:
+                for _ in range(pending):
+                    self._checkpoint_queue.task_done()
+
+    def flush_checkpoint(self):
+        """Block until every queued checkpoint snapshot is on disk"""
+        self._checkpoint_queue.join()
     
     def test_imagemagick(self):
         """Test if ImageMagick is available and working"""
@@ -211,41 +750,54 @@ class PhotogrammetryAutomator:
             self.logger.error(f"ImageMagick test error: {e}")
             raise
 
+    def _get_magick_daemon(self) -> MagickDaemon:
+        """Get (or spawn) the persistent magick process for this thread"""
+        thread_id = get_ident()
+        with self._magick_daemon_lock:
+            daemon = self._magick_daemons.get(thread_id)
+            if daemon is None or daemon.process.poll() is not None:
+                daemon = MagickDaemon(self.imagemagick_path)
+                self._magick_daemons[thread_id] = daemon
+            return daemon
+
+    def _discard_magick_daemon(self):
+        """Drop this thread's daemon so the next call spawns a fresh one"""
+        with self._magick_daemon_lock:
+            daemon = self._magick_daemons.pop(get_ident(), None)
+        if daemon is not None:
+            daemon.close()
+
+    def close_magick_daemons(self):
+        """Shut down all persistent magick processes"""
+        with self._magick_daemon_lock:
+            daemons = list(self._magick_daemons.values())
+            self._magick_daemons.clear()
+        for daemon in daemons:
+            daemon.close()
+
     def analyze_image_exposure(self, image_path: Path) -> Dict:
         """
         Analyze image exposure using ImageMagick to detect overexposure
-        
+
         Args:
             image_path: Path to image file
-            
+
         Returns:
             Dict with exposure analysis results
         """
         try:
-            # Get image statistics
-            result = subprocess.run([
-                self.imagemagick_path, str(image_path),
-                '-colorspace', 'HSL',
-                '-channel', 'L',
-                '-format', '%[fx:mean*100],%[fx:maxima*100]',
-                'info:'
-            ], capture_output=True, text=True, timeout=30)
-            
-            if result.returncode == 0:
-                mean_brightness, max_brightness = map(float, result.stdout.strip().split(','))
-                
-                # Detect overexposure
-                is_overexposed = max_brightness > 95 or mean_brightness > 70
-                
-                return {
-                    'mean_brightness': mean_brightness,
-                    'max_brightness': max_brightness,
-                    'is_overexposed': is_overexposed
-                }
-            else:
-                self.logger.warning(f"Failed to analyze exposure for {image_path.name}")
-                return {'mean_brightness': 50, 'max_brightness': 80, 'is_overexposed': False}
-                
+            # Get image statistics with an in-process Pillow decode
+            mean_brightness, max_brightness = _measure_brightness(image_path)
+
+            # Detect overexposure
+            is_overexposed = _is_overexposed(mean_brightness, max_brightness)
+
+            return {
+                'mean_brightness': mean_brightness,
+                'max_brightness': max_brightness,
+                'is_overexposed': is_overexposed
+            }
+
         except Exception as e:
             self.logger.warning(f"Error analyzing exposure for {image_path.name}: {e}")
             return {'mean_brightness': 50, 'max_brightness': 80, 'is_overexposed': False}
@@ -262,112 +814,50 @@ class PhotogrammetryAutomator:
             else:
                 self.logger.info(message)
 
-    def process_single_image(self, task_data: Dict) -> Dict:
+    def correct_image_exposure(self, input_path: Path, output_path: Path, adjustment: float = None) -> bool:
         """
-        Process a single image for exposure correction (thread worker function)
-        
+        Correct image exposure using ImageMagick
+
         Args:
-            task_data: Dict containing image processing information
-            
+            input_path: Path to input image
+            output_path: Path to output image
+            adjustment: Exposure adjustment override (optional)
+
         Returns:
-            Dict with processing results
+            bool: True if successful, False otherwise
         """
-        image_file = Path(task_data['image_path'])
-        output_file = Path(task_data['output_path'])
-        adjustment = task_data['adjustment']
-        task_id = task_data['task_id']
-        
-        result = {
-            'task_id': task_id,
-            'image_name': image_file.name,
-            'success': False,
-            'was_overexposed': False,
-            'corrected': False,
-            'brightness_before': 0,
-            'brightness_after': 0
-        }
-        
-        try:
-            # Analyze exposure
-            exposure_info = self.analyze_image_exposure(image_file)
-            result['brightness_before'] = exposure_info['mean_brightness']
-            result['was_overexposed'] = exposure_info['is_overexposed']
-            
-            if exposure_info['is_overexposed']:
-                # Apply exposure correction
-                success = self.correct_image_exposure(image_file, output_file, adjustment)
-                
-                if success:
-                    result['corrected'] = True
-                    result['success'] = True
-                    
-                    # Check brightness after correction
-                    new_exposure_info = self.analyze_image_exposure(output_file)
-                    result['brightness_after'] = new_exposure_info['mean_brightness']
-                    
-                    self.safe_log('info', f"[OK] Thread {task_id}: Corrected {image_file.name} ({exposure_info['mean_brightness']:.1f}% -> {new_exposure_info['mean_brightness']:.1f}%)")
-                else:
-                    # Copy original if correction failed
-                    if not output_file.exists():
-                        shutil.copy2(image_file, output_file)
-                    result['success'] = True  # Still successful, just not corrected
-                    self.safe_log('error', f"[FAIL] Thread {task_id}: Failed to correct {image_file.name}, using original")
-            else:
-                # Image is not overexposed, just copy
-                if not output_file.exists():
-                    shutil.copy2(image_file, output_file)
-                result['success'] = True
-                
-        except Exception as e:
-            self.safe_log('error', f"[ERROR] Thread {task_id}: Error processing {image_file.name}: {e}")
-            # Try to copy original as fallback
-            try:
-                if not output_file.exists():
-                    shutil.copy2(image_file, output_file)
-                result['success'] = True
-            except Exception as copy_error:
-                self.safe_log('error', f"[ERROR] Thread {task_id}: Failed to copy {image_file.name}: {copy_error}")
-        
-        return result
-    def correct_image_exposure(self, input_path: Path, output_path: Path, adjustment: float = None) -> bool:
+        return self.correct_and_measure_exposure(input_path, output_path, adjustment) is not None
+
+    def correct_and_measure_exposure(self, input_path: Path, output_path: Path,
+                                     adjustment: float = None) -> Optional[float]:
         """
-        Correct image exposure using ImageMagick
-        
+        Correct image exposure and measure the result in a single pipeline
+
+        The corrected pixels stay in the magick process, which writes the
+        output file and then reports the new mean brightness from the same
+        image — no second decode of the output file.
+
         Args:
             input_path: Path to input image
             output_path: Path to output image
             adjustment: Exposure adjustment override (optional)
-            
+
         Returns:
-            bool: True if successful, False otherwise
+            Mean brightness (%) of the corrected image, or None on failure
         """
         try:
             if adjustment is None:
                 adjustment = self.exposure_adjustment
-            
-            # ImageMagick command for exposure correction
-            # Also includes highlight recovery and shadow enhancement
-            cmd = [
-                self.imagemagick_path, str(input_path),
-                '-modulate', '100,110,100',  # Slightly increase saturation
-                '-evaluate', 'multiply', str(2**(adjustment)),  # Exposure adjustment
-                '-sigmoidal-contrast', '3,50%',  # Reduce highlights, enhance midtones
-                '-auto-level',  # Auto-adjust levels
-                '-unsharp', '0x1',  # Slight sharpening
-                str(output_path)
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-            
-            if result.returncode == 0:
-                return True
-            else:
-                return False
-                
-        except subprocess.TimeoutExpired:
-            return False
+
+            daemon = self._get_magick_daemon()
+            clut_path = _hald_clut_path(daemon, adjustment)
+            output = daemon.run(_correct_script(input_path, output_path, adjustment, clut_path,
+                                                sharpen=self.enable_sharpening))
+            return float(output)
+
         except Exception as e:
-            return False
+            self._discard_magick_daemon()
+            return None
 
     def process_directory_exposure_correction_parallel(self, photo_dir: Path) -> Path:
         """
@@ -383,14 +873,14 @@ class PhotogrammetryAutomator:
             return photo_dir
         
         dir_name = photo_dir.name
-        
+
         # Check if already processed
-        if dir_name in self.checkpoint_data.get('exposure_corrected', []):
+        if dir_name in self.checkpoint_data['exposure_corrected']:
             corrected_dir = photo_dir.parent / f"{dir_name}_corrected"
             if corrected_dir.exists():
                 self.logger.info(f"Using existing exposure-corrected images for {dir_name}")
                 return corrected_dir
-        
+
         self.logger.info(f"Starting parallel exposure correction for {dir_name} using {self.max_workers} threads")
         
         # Create corrected images directory
@@ -410,21 +900,39 @@ class PhotogrammetryAutomator:
         
         # Prepare tasks for parallel processing
         tasks = []
+        skipped_count = 0
         for i, image_file in enumerate(image_files):
             # Determine output path
             if self.keep_originals:
-                output_file = corrected_dir / image_file.name
+                # Output is always .jpg (see _JPEG_WRITE_OPS)
+                output_file = corrected_dir / f"{image_file.stem}.jpg"
+
+                # Output from a previous (possibly interrupted) run that is
+                # at least as new as the original needs no analysis or
+                # correction — re-runs become a pure stat() sweep
+                try:
+                    if output_file.stat().st_mtime >= image_file.stat().st_mtime:
+                        skipped_count += 1
+                        continue
+                except OSError:
+                    pass  # No output yet; process normally
             else:
-                # Create backup first for in-place processing
+                # Rename-then-write for in-place processing: the original
+                # becomes the backup via a metadata-only rename and the
+                # corrected image is written to the original name — no
+                # byte-copy of a file that is about to be replaced anyway
                 backup_file = photo_dir / f"{image_file.stem}_original{image_file.suffix}"
                 if not backup_file.exists():  # Don't overwrite existing backups
-                    shutil.copy2(image_file, backup_file)
-                output_file = image_file
+                    os.rename(image_file, backup_file)
+                output_file = image_file.with_suffix('.jpg')
+                image_file = backup_file
             
             task_data = {
                 'image_path': str(image_file),
                 'output_path': str(output_file),
                 'adjustment': self.exposure_adjustment,
+                'magick_path': self.imagemagick_path,
+                'sharpen': self.enable_sharpening,
                 'task_id': i + 1
             }
             tasks.append(task_data)
@@ -433,37 +941,81 @@ class PhotogrammetryAutomator:
         corrected_count = 0
         overexposed_count = 0
         processed_count = 0
-        
-        self.logger.info(f"Processing {len(tasks)} images with {self.max_workers} parallel threads...")
-        
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all tasks
-            future_to_task = {executor.submit(self.process_single_image, task): task for task in tasks}
-            
-            # Process completed tasks
-            for future in as_completed(future_to_task):
-                result = future.result()
-                processed_count += 1
-                
-                if result['success']:
-                    if result['was_overexposed']:
+        total = len(tasks)
+
+        if skipped_count:
+            self.logger.info(f"Skipped {skipped_count} already-corrected images (output up to date)")
+
+        if tasks:
+            self.logger.info(f"Processing {total} images with {self.max_workers} worker processes...")
+
+            # Worker processes sidestep GIL contention on the Python-side
+            # bookkeeping, and each owns its own persistent magick daemon
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                # One batch analysis pass up front: the pool decodes every
+                # image in parallel and the parent learns which subset needs
+                # correction at all
+                analyses = dict(executor.map(_analyze_image_task,
+                                             [task['image_path'] for task in tasks],
+                                             chunksize=16))
+
+                # Dispatch only the overexposed subset for correction;
+                # everything else short-circuits to a hardlink without a
+                # pool round-trip
+                futures = []
+                for task in tasks:
+                    mean_brightness, max_brightness = analyses[task['image_path']]
+                    if mean_brightness is None:
+                        self.safe_log('warning', f"Error analyzing exposure for {Path(task['image_path']).name}")
+                        mean_brightness, max_brightness = 50, 80
+
+                    if _is_overexposed(mean_brightness, max_brightness):
                         overexposed_count += 1
-                        if result['corrected']:
-                            corrected_count += 1
-                
-                # Progress update every 10 images or at the end
-                with self.progress_lock:
-                    if processed_count % 10 == 0 or processed_count == len(tasks):
-                        progress_pct = (processed_count / len(tasks)) * 100
-                        self.logger.info(f"Progress: {processed_count}/{len(tasks)} images ({progress_pct:.1f}%)")
-        
+                        task['mean_brightness'] = mean_brightness
+                        task['max_brightness'] = max_brightness
+                        futures.append(executor.submit(process_single_image, task))
+                    elif Path(task['image_path']).suffix.lower() in _JPEG_SUFFIXES:
+                        output_file = Path(task['output_path'])
+                        if not output_file.exists():
+                            _link_or_copy(Path(task['image_path']), output_file)
+                        processed_count += 1
+                    else:
+                        # Well-exposed but not JPEG: the worker re-encodes
+                        # it rather than linking PNG bytes to a .jpg name
+                        task['mean_brightness'] = mean_brightness
+                        task['max_brightness'] = max_brightness
+                        futures.append(executor.submit(process_single_image, task))
+
+                if processed_count:
+                    self.logger.info(f"Linked {processed_count}/{total} well-exposed images without correction")
+
+                # Process completed correction tasks
+                for future in as_completed(futures):
+                    result = future.result()
+                    processed_count += 1
+
+                    # Replay messages the worker collected
+                    for level, message in result.get('log', []):
+                        self.safe_log(level, message)
+
+                    if result['success'] and result['corrected']:
+                        corrected_count += 1
+
+                    # Progress update every 10 images or at the end. No
+                    # lock needed: this as_completed loop is the only
+                    # consumer, so the counter is never contended
+                    if processed_count % 10 == 0 or processed_count == total:
+                        progress_pct = (processed_count / total) * 100
+                        self.logger.info(f"Progress: {processed_count}/{total} images ({progress_pct:.1f}%)")
+
+        # Worker daemons died with the pool; reap any spawned in this process
+        self.close_magick_daemons()
+
         # Update checkpoint
-        if dir_name not in self.checkpoint_data.get('exposure_corrected', []):
-            if 'exposure_corrected' not in self.checkpoint_data:
-                self.checkpoint_data['exposure_corrected'] = []
-            self.checkpoint_data['exposure_corrected'].append(dir_name)
+        if dir_name not in self.checkpoint_data['exposure_corrected']:
+            self.checkpoint_data['exposure_corrected'].add(dir_name)
             self.save_checkpoint()
-        
+
         self.logger.info(f"Parallel exposure correction complete for {dir_name}:")
         self.logger.info(f"  Total images: {len(image_files)}")
         self.logger.info(f"  Overexposed detected: {overexposed_count}")
@@ -587,35 +1139,35 @@ class PhotogrammetryAutomator:
             self.logger.info(f"Directory {directory.name} has only {image_count} images (minimum: {self.min_images})")
             return False, image_count
     
-    def update_queue_status(self, directory: Path):
-        """Add directory to queue if not enough images"""
+    def update_queue_status(self, directory: Path, now_iso: Optional[str] = None):
+        """Add directory to queue if not enough images
+
+        Callers iterating many directories pass one now_iso per pass
+        instead of formatting a fresh timestamp for every entry.
+        """
         dir_name = directory.name
-        
-        # Check if already in queue
-        queued_dirs = [item['name'] for item in self.pending_queue]
-        if dir_name not in queued_dirs:
-            self.pending_queue.append({
+        self.db_dirty.set()
+        if now_iso is None:
+            now_iso = datetime.now().isoformat()
+
+        entry = self.pending_queue.get(dir_name)
+        if entry is None:
+            self.pending_queue[dir_name] = {
                 'name': dir_name,
                 'path': str(directory),
-                'first_check': datetime.now().isoformat(),
-                'last_check': datetime.now().isoformat(),
+                'first_check': now_iso,
+                'last_check': now_iso,
                 'check_count': 1
-            })
-            
+            }
+
             # Also update checkpoint
-            if dir_name not in self.checkpoint_data.get('queued', []):
-                if 'queued' not in self.checkpoint_data:
-                    self.checkpoint_data['queued'] = []
-                self.checkpoint_data['queued'].append(dir_name)
-                
+            self.checkpoint_data['queued'].add(dir_name)
+
             self.logger.info(f"Added {dir_name} to pending queue")
         else:
             # Update existing queue entry
-            for item in self.pending_queue:
-                if item['name'] == dir_name:
-                    item['last_check'] = datetime.now().isoformat()
-                    item['check_count'] += 1
-                    break
+            entry['last_check'] = now_iso
+            entry['check_count'] += 1
     
     def process_pending_queue(self) -> List[Path]:
         """
@@ -625,11 +1177,12 @@ class PhotogrammetryAutomator:
             List of directories ready for processing
         """
         ready_directories = []
-        still_pending = []
-        
+        still_pending = {}
+        now_iso = datetime.now().isoformat()  # One timestamp per pass
+
         self.logger.info(f"Checking {len(self.pending_queue)} directories in pending queue...")
-        
-        for item in self.pending_queue:
+
+        for item in self.pending_queue.values():
             directory = Path(item['path'])
             
             if not directory.exists():
@@ -642,14 +1195,13 @@ class PhotogrammetryAutomator:
                 self.logger.info(f"[READY] Directory {item['name']} now has {image_count} images - ready for processing!")
                 ready_directories.append(directory)
                 
-                # Remove from checkpoint queued list
-                if 'queued' in self.checkpoint_data and item['name'] in self.checkpoint_data['queued']:
-                    self.checkpoint_data['queued'].remove(item['name'])
+                # Remove from checkpoint queued set
+                self.checkpoint_data['queued'].discard(item['name'])
             else:
                 self.logger.info(f"[PENDING] Directory {item['name']} still has only {image_count} images (check #{item['check_count']})")
-                item['last_check'] = datetime.now().isoformat()
+                item['last_check'] = now_iso
                 item['check_count'] += 1
-                still_pending.append(item)
+                still_pending[item['name']] = item
         
         # Update pending queue
         self.pending_queue = still_pending
@@ -668,52 +1220,119 @@ class PhotogrammetryAutomator:
         """
         ready_directories = []
         pending_directories = []
-        
-        for item in self.input_dir.iterdir():
-            if item.is_dir():
-                # Skip exposure correction folders (they are internal processing artifacts)
-                if item.name.endswith('_corrected'):
-                    continue
-                
-                # Check if directory contains image files
-                image_extensions = {'.jpg', '.jpeg', '.png', '.tiff', '.bmp', '.raw'}
-                has_images = any(
-                    file.suffix.lower() in image_extensions 
-                    for file in item.iterdir() 
-                    if file.is_file()
-                )
-                
-                if has_images:
-                    is_ready, image_count = self.check_directory_ready(item)
-                    
-                    # Register directory in database
-                    self.db.add_directory(item.name, str(item), image_count)
-                    
-                    # Check if already completed
-                    completed_dirs = [d['name'] for d in self.db.get_completed_directories()]
-                    if item.name in completed_dirs or item.name in self.checkpoint_data['processed']:
-                        continue  # Skip already processed directories
-                    
-                    if is_ready:
-                        ready_directories.append(item)
-                    else:
-                        pending_directories.append(item)
-                        self.db.update_directory_status(item.name, 'queued')
-                        self.update_queue_status(item)
-        
+        now_iso = datetime.now().isoformat()  # One timestamp per pass
+
+        with os.scandir(self.input_dir) as entries:
+            # Skip exposure correction folders (they are internal processing artifacts)
+            subdirs = [Path(entry.path) for entry in entries
+                       if entry.is_dir() and not entry.name.endswith('_corrected')]
+
+        # Counting each directory's images is pure I/O-bound metadata
+        # work, so a thread pool overlaps the per-directory round trips —
+        # on network shares this scan dominates startup latency
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            image_counts = list(executor.map(
+                lambda directory: len(self.get_image_files(directory)), subdirs))
+
+        # One completed-directories query for the whole pass
+        completed_names = {d['name'] for d in self.db.get_completed_directories()}
+
+        for item, image_count in zip(subdirs, image_counts):
+            if image_count == 0:
+                continue  # Not a photo directory
+
+            # Register directory in database
+            self.db.add_directory(item.name, str(item), image_count)
+            self.db_dirty.set()
+
+            # Check if already completed
+            if item.name in completed_names or item.name in self.checkpoint_data['processed']:
+                continue  # Skip already processed directories
+
+            if image_count >= self.min_images:
+                ready_directories.append(item)
+            else:
+                self.logger.info(f"Directory {item.name} has only {image_count} images (minimum: {self.min_images})")
+                pending_directories.append(item)
+                self.db.update_directory_status(item.name, 'queued')
+                self.update_queue_status(item, now_iso)
+
         return sorted(ready_directories), sorted(pending_directories)
     
     def get_image_files(self, directory: Path) -> List[Path]:
-        """Get all image files from a directory"""
-        image_extensions = {'.jpg', '.jpeg', '.png', '.tiff', '.bmp', '.raw'}
-        image_files = []
-        
-        for file in directory.iterdir():
-            if file.is_file() and file.suffix.lower() in image_extensions:
-                image_files.append(file)
-        
-        return sorted(image_files)
+        """Get all image files from a directory
+
+        Results are cached per (directory, mtime): discovery, readiness
+        checks, exposure correction and project creation all list the same
+        folder within one pass, and the mtime key invalidates the entry as
+        soon as new photos land during queue polling.
+        """
+        return list(_scan_image_files(str(directory), os.stat(directory).st_mtime))
     
+    def _run_cli(self, commands: List[str], job_name: str) -> int:
+        """Run a reconstruction CLI job, streaming its output to the log
+
+        Holds O(one line) of output instead of buffering two hours of
+        progress text, and surfaces errors while the job is still running
+        rather than after it ends. stdout lines log at info, stderr at
+        error; each is prefixed with the job name so concurrent CLI
+        workers stay distinguishable.
+
+        Returns:
+            int: the process return code
+
+        Raises:
+            subprocess.TimeoutExpired: after killing a job that overran
+                the 2 hour limit
+        """
+        # Bind the job to its own GPU when a device pool is configured.
+        # popleft cannot underflow: the dispatch pool is clamped to the
+        # number of configured ids
+        gpu_id = None
+        env = None
+        if self._gpu_pool is not None:
+            gpu_id = self._gpu_pool.popleft()
+            env = {**os.environ, 'CUDA_VISIBLE_DEVICES': str(gpu_id)}
+            self.safe_log('info', f"[{job_name}] Running on GPU {gpu_id}")
+
+        try:
+            process = subprocess.Popen(
+                commands,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                env=env
+            )
+
+            def pump(stream, level):
+                for line in stream:
+                    line = line.rstrip()
+                    if line:
+                        self.safe_log(level, f"[{job_name}] {line}")
+                stream.close()
+
+            readers = [
+                Thread(target=pump, args=(process.stdout, 'info'), daemon=True),
+                Thread(target=pump, args=(process.stderr, 'error'), daemon=True),
+            ]
+            for reader in readers:
+                reader.start()
+
+            try:
+                returncode = process.wait(timeout=7200)  # 2 hour timeout for large datasets
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+                raise
+            finally:
+                for reader in readers:
+                    reader.join(timeout=10)
+
+            return returncode
+        finally:
+            if gpu_id is not None:
+                self._gpu_pool.append(gpu_id)
+
     def create_realitycapture_project(self, photo_dir: Path, output_path: Path) -> bool:
         """
         Create 3D model using RealityCapture CLI
@@ -733,66 +1352,68 @@ class PhotogrammetryAutomator:
                 self.logger.warning(f"No image files found in {photo_dir}")
                 return False
             
-            self.logger.info(f"Processing {len(image_files)} images from {photo_dir.name}")
-            
-            # Create RealityCapture project file path
-            project_file = output_path / f"{photo_dir.name}.rcproj"
-            
+            name = photo_dir.name
+            self.logger.info(f"Processing {len(image_files)} images from {name}")
+
+            # Materialize each path string once; they are reused in the
+            # command list and the post-run checks
+            project_path = str(output_path / f"{name}.rcproj")
+            obj_name = f"{name}.obj"
+            textured_name = f"{name}_textured.obj"
+
             # RealityCapture CLI commands based on official documentation
+            # Passed as an argv list: no shell fork, no re-parsing, and
+            # paths with spaces need no quoting
             commands = [
-                f'"{self.software_exe}"',
+                self.software_exe,
                 '-headless',  # Run without UI for automation
-                f'-addFolder "{photo_dir}"',
-                f'-save "{project_file}"',
+                '-addFolder', str(photo_dir),
+                '-save', project_path,
                 '-align',  # Align images
                 '-selectMaximalComponent',  # Select largest component
                 '-calculateNormalModel',  # Calculate 3D model
-                f'-exportSelectedModel "{output_path / (photo_dir.name + ".obj")}" -exportFormat obj',
+                '-exportSelectedModel', str(output_path / obj_name),
+                '-exportFormat', 'obj',
                 '-calculateTexture',  # Calculate texture
-                f'-exportSelectedModel "{output_path / (photo_dir.name + "_textured.obj")}" -exportFormat obj',
-                f'-save "{project_file}"',
+                '-exportSelectedModel', str(output_path / textured_name),
+                '-exportFormat', 'obj',
+                '-save', project_path,
                 '-quit'
             ]
-            
-            # Combine commands into single command line
-            full_command = ' '.join(commands)
-            
-            self.logger.info(f"Executing RealityCapture command for {photo_dir.name}")
-            self.logger.debug(f"Command: {full_command}")
-            
-            # Execute RealityCapture
-            result = subprocess.run(
-                full_command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=7200  # 2 hour timeout for large datasets
-            )
-            
-            if result.returncode == 0:
-                self.logger.info(f"Successfully processed {photo_dir.name}")
-                
-                # Check if output files were created
-                obj_file = output_path / f"{photo_dir.name}.obj"
-                textured_obj_file = output_path / f"{photo_dir.name}_textured.obj"
-                
-                if obj_file.exists():
-                    self.logger.info(f"[SUCCESS] Model exported: {obj_file.name}")
-                if textured_obj_file.exists():
-                    self.logger.info(f"[SUCCESS] Textured model exported: {textured_obj_file.name}")
-                
+
+            self.logger.info(f"Executing RealityCapture command for {name}")
+            self.logger.debug(f"Command: {' '.join(commands)}")
+
+            # Execute RealityCapture, streaming its output to the log
+            returncode = self._run_cli(commands, name)
+
+            if returncode == 0:
+                self.logger.info(f"Successfully processed {name}")
+
+                # Check if output files were created — one directory scan
+                # instead of a stat per expected file
+                with os.scandir(output_path) as entries:
+                    output_names = {entry.name for entry in entries}
+
+                if obj_name in output_names:
+                    self.logger.info(f"[SUCCESS] Model exported: {obj_name}")
+                if textured_name in output_names:
+                    self.logger.info(f"[SUCCESS] Textured model exported: {textured_name}")
+
                 return True
             else:
-                self.logger.error(f"RealityCapture failed for {photo_dir.name}")
-                self.logger.error(f"Return code: {result.returncode}")
-                self.logger.error(f"Error output: {result.stderr}")
-                if result.stdout:
-                    self.logger.info(f"Standard output: {result.stdout}")
+                self.logger.error(f"RealityCapture failed for {name}")
+                self.logger.error(f"Return code: {returncode} (see streamed output above)")
+                if returncode in _FATAL_RETURN_CODES:
+                    raise RealityCaptureFatalError(
+                        f"RealityCapture exited with fatal code {returncode} for {name}")
                 return False
-                
+
         except subprocess.TimeoutExpired:
             self.logger.error(f"RealityCapture timed out for {photo_dir.name}")
             return False
+        except RealityCaptureFatalError:
+            raise
         except Exception as e:
             self.logger.error(f"Error processing {photo_dir.name}: {str(e)}")
             return False
@@ -816,92 +1437,165 @@ class PhotogrammetryAutomator:
                 self.logger.warning(f"No image files found in {photo_dir}")
                 return False
             
-            self.logger.info(f"Processing {len(image_files)} images from {photo_dir.name}")
-            
-            # Create RealityScan project file path
-            project_file = output_path / f"{photo_dir.name}.rsproj"
-            
-            # RealityScan CLI commands - corrected workflow for texture calculation
+            name = photo_dir.name
+            self.logger.info(f"Processing {len(image_files)} images from {name}")
+
+            # Materialize each path string once; they are reused in the
+            # command list and the post-run checks
+            project_path = str(output_path / f"{name}.rsproj")
+            obj_name = f"{name}.obj"
+            textured_name = f"{name}_textured.obj"
+
+            # RealityScan CLI commands - corrected workflow for texture
+            # calculation. Passed as an argv list: no shell fork, no
+            # re-parsing, paths with spaces need no quoting, and on
+            # timeout the CLI process itself gets killed instead of an
+            # intermediate shell
             commands = [
-                f'"{self.software_exe}"',
-                '-headless',  # Run without UI for automation  
-                f'-addFolder "{photo_dir}"',
-                f'-save "{project_file}"',
+                self.software_exe,
+                '-headless',  # Run without UI for automation
+                '-addFolder', str(photo_dir),
+                '-save', project_path,
                 '-align',  # Align images
                 '-selectMaximalComponent',  # Select largest component
                 '-setReconstructionRegionAuto',  # Set reconstruction region automatically
                 '-calculateNormalModel',  # Calculate 3D model
-                f'-save "{project_file}"',  # Save after model calculation
-                f'-exportSelectedModel "{output_path / (photo_dir.name + ".obj")}" -exportFormat obj',
+                '-save', project_path,  # Save after model calculation
+                '-exportSelectedModel', str(output_path / obj_name),
+                '-exportFormat', 'obj',
                 '-calculateTexture',  # Calculate texture - must be done after model export
-                f'-save "{project_file}"',  # Save after texture calculation
-                f'-exportSelectedModel "{output_path / (photo_dir.name + "_textured.obj")}" -exportFormat obj -exportTexture',
-                f'-save "{project_file}"',
+                '-save', project_path,  # Save after texture calculation
+                '-exportSelectedModel', str(output_path / textured_name),
+                '-exportFormat', 'obj',
+                '-exportTexture',
+                '-save', project_path,
                 '-quit'
             ]
-            
-            # Combine commands into single command line
-            full_command = ' '.join(commands)
-            
-            self.logger.info(f"Executing RealityScan command for {photo_dir.name}")
-            self.logger.debug(f"Command: {full_command}")
-            
-            # Execute RealityScan
-            result = subprocess.run(
-                full_command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=7200  # 2 hour timeout for large datasets
-            )
-            
-            if result.returncode == 0:
-                self.logger.info(f"Successfully processed {photo_dir.name}")
-                
-                # Check if output files were created
-                obj_file = output_path / f"{photo_dir.name}.obj"
-                textured_obj_file = output_path / f"{photo_dir.name}_textured.obj"
-                
-                if obj_file.exists():
-                    self.logger.info(f"[SUCCESS] Model exported: {obj_file.name}")
-                if textured_obj_file.exists():
-                    self.logger.info(f"[SUCCESS] Textured model exported: {textured_obj_file.name}")
+
+            self.logger.info(f"Executing RealityScan command for {name}")
+            self.logger.debug(f"Command: {' '.join(commands)}")
+
+            # Execute RealityScan, streaming its output to the log
+            returncode = self._run_cli(commands, name)
+
+            if returncode == 0:
+                self.logger.info(f"Successfully processed {name}")
+
+                # Check if output files were created — one directory scan
+                # instead of per-file exists() checks and three globs
+                with os.scandir(output_path) as entries:
+                    output_names = {entry.name for entry in entries}
+
+                if obj_name in output_names:
+                    self.logger.info(f"[SUCCESS] Model exported: {obj_name}")
+                if textured_name in output_names:
+                    self.logger.info(f"[SUCCESS] Textured model exported: {textured_name}")
                 else:
-                    self.logger.warning(f"[WARNING] Textured model not found: {textured_obj_file.name}")
+                    self.logger.warning(f"[WARNING] Textured model not found: {textured_name}")
                     # Check for texture files that might have been created
-                    texture_files = list(output_path.glob(f"{photo_dir.name}*.jpg")) + \
-                                   list(output_path.glob(f"{photo_dir.name}*.png")) + \
-                                   list(output_path.glob(f"{photo_dir.name}*.mtl"))
+                    texture_files = [entry_name for entry_name in output_names
+                                     if entry_name.startswith(name)
+                                     and entry_name.endswith(('.jpg', '.png', '.mtl'))]
                     if texture_files:
-                        self.logger.info(f"[INFO] Found texture files: {[f.name for f in texture_files]}")
-                
+                        self.logger.info(f"[INFO] Found texture files: {sorted(texture_files)}")
+
                 return True
             else:
-                self.logger.error(f"RealityScan failed for {photo_dir.name}")
-                self.logger.error(f"Return code: {result.returncode}")
-                self.logger.error(f"Error output: {result.stderr}")
-                if result.stdout:
-                    self.logger.info(f"Standard output: {result.stdout}")
+                self.logger.error(f"RealityScan failed for {name}")
+                self.logger.error(f"Return code: {returncode} (see streamed output above)")
+                if returncode in _FATAL_RETURN_CODES:
+                    raise RealityCaptureFatalError(
+                        f"RealityScan exited with fatal code {returncode} for {name}")
                 return False
-                
+
         except subprocess.TimeoutExpired:
             self.logger.error(f"RealityScan timed out for {photo_dir.name}")
             return False
+        except RealityCaptureFatalError:
+            raise
         except Exception as e:
             self.logger.error(f"Error processing {photo_dir.name} with RealityScan: {str(e)}")
             return False
     
+    def _write_output_manifest(self, output_subdir: Path, dir_name: str,
+                               image_count: int):
+        """Record the exported model files so later runs can skip the CLI
+
+        The manifest pins each output's size and mtime plus the input
+        image count; if any of them drift the next run re-processes.
+        """
+        wanted = (f"{dir_name}.obj", f"{dir_name}_textured.obj")
+        outputs = {}
+        try:
+            # One directory scan instead of a stat per output; the
+            # DirEntry stat comes for free from the scan on most systems
+            with os.scandir(output_subdir) as entries:
+                for entry in entries:
+                    if entry.name in wanted:
+                        stat = entry.stat()
+                        outputs[entry.name] = {'size': stat.st_size,
+                                               'mtime_ns': stat.st_mtime_ns}
+        except OSError:
+            return
+
+        if not outputs:
+            return  # Nothing exported; nothing worth pinning
+
+        manifest = {'image_count': image_count, 'outputs': outputs}
+        manifest_file = output_subdir / _MANIFEST_NAME
+        try:
+            tmp_file = f'{manifest_file}.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(tmp_file, manifest_file)
+        except OSError as e:
+            self.logger.warning(f"Failed to write output manifest for {dir_name}: {e}")
+
+    def _outputs_up_to_date(self, output_subdir: Path, dir_name: str,
+                            image_count: int) -> bool:
+        """Check whether a previous run's exports are still valid
+
+        True only when a manifest exists, the input image count is
+        unchanged and every recorded output still matches its pinned
+        size and mtime — the cheap stat sweep that spares a multi-hour
+        CLI re-run after a partial failure elsewhere in the batch.
+        """
+        try:
+            with open(output_subdir / _MANIFEST_NAME) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if manifest.get('image_count') != image_count:
+            return False
+
+        outputs = manifest.get('outputs') or {}
+        if f"{dir_name}.obj" not in outputs:
+            return False
+
+        for name, recorded in outputs.items():
+            try:
+                stat = os.stat(output_subdir / name)
+            except OSError:
+                return False
+            if (stat.st_size != recorded.get('size')
+                    or stat.st_mtime_ns != recorded.get('mtime_ns')):
+                return False
+
+        return True
+
     def process_directory(self, photo_dir: Path) -> bool:
         """Process a single directory"""
         dir_name = photo_dir.name
-        
+        self.db_dirty.set()
+
         # Check database first, then fall back to checkpoint
         completed_dirs = [d['name'] for d in self.db.get_completed_directories()]
-        if (dir_name in completed_dirs or 
+        if (dir_name in completed_dirs or
             dir_name in self.checkpoint_data['processed']):
             self.logger.info(f"Skipping {dir_name} (already processed)")
             return True
-        
+
         # Double-check image count before processing
         is_ready, image_count = self.check_directory_ready(photo_dir)
         if not is_ready:
@@ -911,7 +1605,20 @@ class PhotogrammetryAutomator:
             self.db.update_directory_status(dir_name, 'queued')
             self.update_queue_status(photo_dir)
             return False
-        
+
+        # Valid exports from an earlier run short-circuit the whole CLI
+        # invocation — the checkpoint may have missed them if that run
+        # died between export and save
+        output_subdir = self.output_dir / dir_name
+        if self._outputs_up_to_date(output_subdir, dir_name, image_count):
+            self.logger.info(f"Skipping {dir_name} (exported models already up to date)")
+            self.db.add_directory(dir_name, str(photo_dir), image_count)
+            self.db.update_directory_status(dir_name, 'completed',
+                                            has_exposure_correction=self.enable_exposure_correction)
+            self.checkpoint_data['processed'].add(dir_name)
+            self.save_checkpoint()
+            return True
+
         # Add directory to database as processing
         self.db.add_directory(dir_name, str(photo_dir), image_count)
         self.db.update_directory_status(dir_name, 'processing')
@@ -927,40 +1634,98 @@ class PhotogrammetryAutomator:
             corrected_photo_dir = photo_dir
         
         # Create output subdirectory
-        output_subdir = self.output_dir / dir_name
         output_subdir.mkdir(exist_ok=True)
         
         self.logger.info(f"Starting 3D processing of {dir_name} ({image_count} images)")
         
         # Process with appropriate software
-        if self.software_type == "realitycapture":
-            success = self.create_realitycapture_project(corrected_photo_dir, output_subdir)
-        elif self.software_type == "realityscan":
-            success = self.create_realityscan_project(corrected_photo_dir, output_subdir)
-        else:
-            self.logger.error(f"Unknown software type: {self.software_type}")
-            success = False
+        try:
+            if self.software_type == "realitycapture":
+                success = self.create_realitycapture_project(corrected_photo_dir, output_subdir)
+            elif self.software_type == "realityscan":
+                success = self.create_realityscan_project(corrected_photo_dir, output_subdir)
+            else:
+                self.logger.error(f"Unknown software type: {self.software_type}")
+                success = False
+        except RealityCaptureFatalError:
+            # Record the failure before the abort propagates so this
+            # directory is not silently lost from database and checkpoint
+            self.db.update_directory_status(dir_name, 'failed',
+                                            error_message="Fatal CLI error",
+                                            processing_time=int(time.time() - start_time))
+            self.checkpoint_data['failed'].add(dir_name)
+            self.save_checkpoint()
+            raise
         
         # Calculate processing time
         processing_time = int(time.time() - start_time)
         
         # Update database and checkpoint
         if success:
-            self.db.update_directory_status(dir_name, 'completed', 
+            self._write_output_manifest(output_subdir, dir_name, image_count)
+            self.db.update_directory_status(dir_name, 'completed',
                                            processing_time=processing_time,
                                            has_exposure_correction=self.enable_exposure_correction)
-            self.checkpoint_data['processed'].append(dir_name)
+            self.checkpoint_data['processed'].add(dir_name)
             self.logger.info(f"[SUCCESS] Successfully processed {dir_name} in {processing_time}s")
         else:
             self.db.update_directory_status(dir_name, 'failed', 
                                            error_message="Processing failed",
                                            processing_time=processing_time)
-            self.checkpoint_data['failed'].append(dir_name)
+            self.checkpoint_data['failed'].add(dir_name)
             self.logger.error(f"[FAILED] Failed to process {dir_name}")
         
         self.save_checkpoint()
         return success
     
+    def _process_directories(self, directories: List[Path]) -> tuple[int, int]:
+        """Run process_directory over a batch of directories
+
+        Dispatches up to max_cli_workers jobs concurrently. Threads (not
+        processes) are the right pool here: each job spends nearly all of
+        its time blocked on the RealityCapture/RealityScan subprocess, and
+        the database and checkpoint are already thread-safe. With the
+        default of one worker this degrades to the old serial loop.
+
+        Returns:
+            tuple: (successful, failed) counts for the batch
+        """
+        successful = 0
+        failed = 0
+        total = len(directories)
+        inv_total = 100.0 / total if total else 0.0
+
+        with ThreadPoolExecutor(max_workers=self.max_cli_workers) as executor:
+            future_dirs = {executor.submit(self.process_directory, photo_dir): photo_dir
+                           for photo_dir in directories}
+
+            for done, future in enumerate(as_completed(future_dirs), 1):
+                photo_dir = future_dirs[future]
+                try:
+                    success = future.result()
+                except RealityCaptureFatalError as e:
+                    # Systemic failure (license, GPU): every remaining job
+                    # would fail the same way, so stop feeding the pool
+                    self.logger.error(f"Fatal CLI error, aborting remaining directories: {e}")
+                    self._fatal_error = e
+                    for pending in future_dirs:
+                        pending.cancel()
+                    failed += 1
+                    break
+                except Exception as e:
+                    self.logger.error(f"Unhandled error processing {photo_dir.name}: {e}")
+                    success = False
+
+                if success:
+                    successful += 1
+                else:
+                    failed += 1
+
+                self.progress_fraction = done / total if total else 0.0
+                self.logger.info(f"Progress: {done}/{total} directories ({done * inv_total:.1f}%)")
+
+        return successful, failed
+
     def run(self):
         """Main processing loop with queue management"""
         self.logger.info("Starting 3D model automation")
@@ -987,81 +1752,111 @@ class PhotogrammetryAutomator:
         failed = 0
         
         if ready_directories:
-            self.logger.info(f"\n{'='*60}")
-            self.logger.info("PROCESSING READY DIRECTORIES")
-            self.logger.info(f"{'='*60}")
-            
-            for i, photo_dir in enumerate(ready_directories, 1):
-                if photo_dir.name in self.checkpoint_data['processed']:
-                    continue
-                    
-                self.logger.info(f"\nProcessing directory {i}/{len(ready_directories)}: {photo_dir.name}")
-                self.logger.info(f"Progress: {i/len(ready_directories)*100:.1f}%")
-                
-                if self.process_directory(photo_dir):
-                    successful += 1
-                else:
-                    failed += 1
-        
-        # Monitor queue for directories with growing image counts
-        if self.pending_queue or pending_directories:
-            self.logger.info(f"\n{'='*60}")
-            self.logger.info("MONITORING PENDING QUEUE")
-            self.logger.info(f"Queue check interval: {self.queue_check_interval} seconds")
-            self.logger.info(f"{'='*60}")
-            
+            self.logger.info(f"\n{_SEP}\nPROCESSING READY DIRECTORIES\n{_SEP}")
+
+            to_process = [photo_dir for photo_dir in ready_directories
+                          if photo_dir.name not in self.checkpoint_data['processed']]
+            if to_process:
+                self.logger.info(f"Dispatching {len(to_process)} directories across "
+                                 f"{self.max_cli_workers} concurrent CLI job(s)")
+                successful, failed = self._process_directories(to_process)
+        
+        # Monitor queue for directories with growing image counts (not
+        # after a fatal CLI error — every further job would fail the same
+        # way, so fall through to the summary and final checkpoint)
+        if (self.pending_queue or pending_directories) and self._fatal_error is None:
+            self.logger.info(f"\n{_SEP}\nMONITORING PENDING QUEUE\n"
+                             f"Queue check interval: {self.queue_check_interval} seconds\n{_SEP}")
+
+            # Event-driven wakeups when watchdog is available: new images
+            # trigger an immediate re-check instead of waiting out the
+            # interval, and an idle queue costs no syscalls at all
+            wake_event = Event()
+            observer = None
+            if Observer is not None:
+                try:
+                    observer = Observer()
+                    handler = _PendingImageHandler(wake_event)
+                    for item in self.pending_queue.values():
+                        if os.path.isdir(item['path']):
+                            observer.schedule(handler, item['path'], recursive=False)
+                    observer.start()
+                    self.logger.info("Watching pending directories for new images (event-driven)")
+                except Exception as e:
+                    self.logger.warning(f"Filesystem watcher unavailable ({e}), falling back to polling")
+                    observer = None
+
             queue_check_count = 0
+            stale_checks = 0
             last_queue_size = len(self.pending_queue)
-            
-            while self.pending_queue:
-                queue_check_count += 1
-                self.logger.info(f"\n--- Queue Check #{queue_check_count} ---")
-                self.logger.info(f"Pending directories: {len(self.pending_queue)}")
-                
-                # Check if any queued directories are now ready
-                newly_ready = self.process_pending_queue()
-                
-                if newly_ready:
-                    self.logger.info(f"Processing {len(newly_ready)} newly ready directories...")
-                    
-                    for photo_dir in newly_ready:
-                        self.logger.info(f"\nProcessing queued directory: {photo_dir.name}")
-                        
-                        if self.process_directory(photo_dir):
-                            successful += 1
+
+            try:
+                while self.pending_queue:
+                    queue_check_count += 1
+                    self.logger.info(f"\n--- Queue Check #{queue_check_count} ---")
+                    self.logger.info(f"Pending directories: {len(self.pending_queue)}")
+
+                    # Check if any queued directories are now ready
+                    newly_ready = self.process_pending_queue()
+
+                    if newly_ready:
+                        self.logger.info(f"Processing {len(newly_ready)} newly ready directories...")
+
+                        batch_ok, batch_failed = self._process_directories(newly_ready)
+                        successful += batch_ok
+                        failed += batch_failed
+
+                        if self._fatal_error is not None:
+                            break
+
+                    # Break once the queue has sat unchanged through several
+                    # full intervals with no filesystem activity (event
+                    # wakeups reset the stale counter below)
+                    current_queue_size = len(self.pending_queue)
+                    if current_queue_size == last_queue_size and stale_checks >= 5:
+                        time_waiting = stale_checks * self.queue_check_interval
+                        self.logger.info(f"Queue size unchanged for {time_waiting} seconds. Assuming copy operations complete.")
+
+                        # Log remaining directories that didn't meet threshold
+                        if self.pending_queue:
+                            self.logger.info("Directories still below minimum image threshold:")
+                            for item in self.pending_queue.values():
+                                dir_path = Path(item['path'])
+                                if dir_path.exists():
+                                    _, current_count = self.check_directory_ready(dir_path)
+                                    self.logger.info(f"  - {item['name']}: {current_count} images")
+                        break
+
+                    if current_queue_size != last_queue_size:
+                        stale_checks = 0
+                    last_queue_size = current_queue_size
+
+                    if self.pending_queue:  # Only wait if there are still pending items
+                        if observer is not None:
+                            self.logger.info(f"Waiting for new images (up to {self.queue_check_interval} seconds)...")
+                            if wake_event.wait(timeout=self.queue_check_interval):
+                                wake_event.clear()
+                                stale_checks = 0
+                            else:
+                                stale_checks += 1
                         else:
-                            failed += 1
-                
-                # Break if queue hasn't changed for several checks (no new files being copied)
-                current_queue_size = len(self.pending_queue)
-                if current_queue_size == last_queue_size and queue_check_count > 5:
-                    time_waiting = queue_check_count * self.queue_check_interval
-                    self.logger.info(f"Queue size unchanged for {time_waiting} seconds. Assuming copy operations complete.")
-                    
-                    # Log remaining directories that didn't meet threshold
-                    if self.pending_queue:
-                        self.logger.info("Directories still below minimum image threshold:")
-                        for item in self.pending_queue:
-                            dir_path = Path(item['path'])
-                            if dir_path.exists():
-                                _, current_count = self.check_directory_ready(dir_path)
-                                self.logger.info(f"  - {item['name']}: {current_count} images")
-                    break
-                
-                last_queue_size = current_queue_size
-                
-                if self.pending_queue:  # Only sleep if there are still pending items
-                    self.logger.info(f"Waiting {self.queue_check_interval} seconds before next check...")
-                    time.sleep(self.queue_check_interval)
+                            self.logger.info(f"Waiting {self.queue_check_interval} seconds before next check...")
+                            time.sleep(self.queue_check_interval)
+                            stale_checks += 1
+            finally:
+                if observer is not None:
+                    observer.stop()
+                    observer.join()
         
         # Final summary
+        if self._fatal_error is not None:
+            self.logger.error(f"Run aborted early: {self._fatal_error}")
+
         total_processed = successful + failed
-        self.logger.info(f"\n{'='*60}")
-        self.logger.info("PROCESSING COMPLETE")
-        self.logger.info(f"{'='*60}")
-        self.logger.info(f"Directories processed this session: {total_processed}")
-        self.logger.info(f"Successfully processed: {successful}")
-        self.logger.info(f"Failed: {failed}")
+        self.logger.info(f"\n{_SEP}\nPROCESSING COMPLETE\n{_SEP}\n"
+                         f"Directories processed this session: {total_processed}\n"
+                         f"Successfully processed: {successful}\n"
+                         f"Failed: {failed}")
         
         if total_processed > 0:
             self.logger.info(f"Success rate: {successful/total_processed*100:.1f}%")
@@ -1070,13 +1865,16 @@ class PhotogrammetryAutomator:
         self.logger.info(f"Total processed (including previous runs): {total_in_checkpoint}")
         
         if self.checkpoint_data.get('failed'):
-            self.logger.info(f"Failed directories: {', '.join(self.checkpoint_data['failed'])}")
+            self.logger.info(f"Failed directories: {', '.join(sorted(self.checkpoint_data['failed']))}")
         
         if self.pending_queue:
-            pending_names = [item['name'] for item in self.pending_queue]
+            pending_names = list(self.pending_queue)
             self.logger.info(f"Still pending (insufficient images): {', '.join(pending_names)}")
             self.logger.info("Tip: Run the script again later if copy operations are still in progress")
 
+        # The writer thread is a daemon; make sure nothing queued is lost
+        self.flush_checkpoint()
+
 def main():
     parser = argparse.ArgumentParser(description='Automate 3D model creation with RealityCapture or RealityScan')
     parser.add_argument('input_dir', help='Input directory containing photo folders')
@@ -1102,9 +1900,19 @@ def main():
                        help='Exposure adjustment in stops, negative = darker (default: -0.5)')
     parser.add_argument('--no-keep-originals', action='store_true',
                        help='Overwrite original images instead of creating copies')
+    parser.add_argument('--enable-sharpening', action='store_true',
+                       help='Apply slight sharpening to corrected images (off by default)')
     # Threading arguments
     parser.add_argument('--max-workers', type=int, default=4,
                        help='Number of parallel threads for image processing (default: 4)')
+    parser.add_argument('--max-cli-workers', type=int, default=1,
+                       help='Number of concurrent RealityCapture/RealityScan jobs '
+                            '(default: 1; raise only if GPU and license allow)')
+    parser.add_argument('--gpu-ids', default=None,
+                       help='Comma-separated GPU device ids to spread CLI jobs over, '
+                            'e.g. 0,1,2 (each job gets one via CUDA_VISIBLE_DEVICES)')
+    parser.add_argument('--license-slots', type=int, default=None,
+                       help='Cap on concurrent CLI jobs the license allows')
     
     args = parser.parse_args()
     
@@ -1148,7 +1956,11 @@ def main():
         imagemagick_path=args.imagemagick_path,
         exposure_adjustment=args.exposure_adjustment,
         keep_originals=not args.no_keep_originals,
-        max_workers=args.max_workers
+        max_workers=args.max_workers,
+        enable_sharpening=args.enable_sharpening,
+        max_cli_workers=args.max_cli_workers,
+        gpu_ids=[int(gpu_id) for gpu_id in args.gpu_ids.split(',')] if args.gpu_ids else None,
+        license_slots=args.license_slots
     )
     
     try:
@@ -12,31 +12,169 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext
 import threading
 import queue
+import collections
+import gc
+import hashlib
+import io
 import os
+import shutil
 import sys
 import json
 from pathlib import Path
 import logging
+import logging.handlers
+import time
 from datetime import datetime
-from PIL import Image, ImageTk
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import math
 
-# Import our main automation class
-from main import PhotogrammetryAutomator
+# PIL and the automation module (which pulls in the whole processing
+# stack) are imported lazily at their call sites: PIL when a preview
+# is populated, PhotogrammetryAutomator when processing starts. That
+# keeps cold startup down to Tk window creation.
+
+# Optional: RAW previews need rawpy; without it RAW thumbnails show a
+# placeholder instead of attempting a full RAW decode in the UI
+try:
+    import rawpy
+except ImportError:
+    rawpy = None
 
 # Set appearance mode and color theme
 ctk.set_appearance_mode("System")  # Modes: "System" (standard), "Dark", "Light"
 ctk.set_default_color_theme("blue")  # Themes: "blue" (standard), "green", "dark-blue"
 
-class LogHandler(logging.Handler):
-    """Custom logging handler to redirect logs to UI"""
-    def __init__(self, log_queue):
-        super().__init__()
-        self.log_queue = log_queue
-    
-    def emit(self, record):
-        log_entry = self.format(record)
-        self.log_queue.put(log_entry)
+# Extensions without the leading dot, so scandir entries can be tested
+# with a cheap string split instead of building a Path per entry
+IMAGE_EXTS_NO_DOT = frozenset({
+    'jpg', 'jpeg', 'png', 'tiff', 'tif', 'bmp', 'raw', 'cr2', 'nef', 'arw'
+})
+
+# Camera RAW formats Pillow cannot decode on its own
+RAW_EXTS = frozenset({'raw', 'cr2', 'nef', 'arw'})
+
+# Longest filename shown under a thumbnail before truncation
+NAME_MAX = 15
+
+# Decoded thumbnails are cached on disk so reopening a directory only
+# reads the small cached PNGs instead of re-decoding the originals
+THUMB_CACHE_DIR = Path.home() / ".morfi_cache" / "thumbs"
+
+
+def thumb_cache_path(image_file, size, mtime_ns=None):
+    """Cache file path for a thumbnail, keyed on path, mtime and size
+
+    The mtime is part of the key, so a re-shot or edited photo gets a
+    fresh cache entry and the stale one is simply never read again.
+    Callers that already hold a stat result can pass mtime_ns to avoid
+    a second stat syscall.
+    """
+    if mtime_ns is None:
+        mtime_ns = image_file.stat().st_mtime_ns
+    key = f"{image_file}|{mtime_ns}|{size}"
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+    return THUMB_CACHE_DIR / f"{digest}.png"
+
+
+def decode_thumb_image(image_file, size):
+    """Decode one image downscaled to at most size x size
+
+    For JPEGs (the common case for photogrammetry shoots), Image.draft
+    lets libjpeg do most of the downscaling in the DCT domain during
+    decode instead of materialising the full-resolution frame; the
+    final LANCZOS pass from roughly 2x the target keeps the quality.
+    RAW files are rendered from their embedded preview via rawpy when
+    it is installed, and raise otherwise so the caller can show a
+    placeholder.
+    """
+    from PIL import Image
+
+    if image_file.suffix.lstrip('.').lower() in RAW_EXTS:
+        if rawpy is None:
+            raise ValueError(f"rawpy not installed, cannot preview {image_file.name}")
+        with rawpy.imread(str(image_file)) as raw:
+            thumb = raw.extract_thumb()
+        if thumb.format == rawpy.ThumbFormat.JPEG:
+            img = Image.open(io.BytesIO(thumb.data))
+        else:
+            img = Image.fromarray(thumb.data)
+        with img:
+            img.thumbnail((size, size), Image.Resampling.LANCZOS)
+            return img.copy()
+
+    with Image.open(image_file) as img:
+        if img.format == 'JPEG':
+            img.draft('RGB', (size * 2, size * 2))
+        img.thumbnail((size, size), Image.Resampling.LANCZOS)
+        return img.copy()
+
+
+def dir_has_image(directory):
+    """Check whether a directory contains at least one image
+
+    Returns on the first matching entry rather than scanning and
+    sorting the whole directory — the difference matters when probing
+    hundreds of subdirectories, especially on network drives.
+    """
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if (entry.name.rpartition('.')[2].lower() in IMAGE_EXTS_NO_DOT
+                        and entry.is_file(follow_symlinks=False)):
+                    return True
+    except OSError:
+        pass
+    return False
+
+
+@lru_cache(maxsize=4)
+def _parse_settings(path, mtime_ns):
+    """Read and parse a settings file
+
+    Cached on (path, mtime_ns): reloading unchanged settings costs a
+    stat, not a read and a JSON parse.
+    """
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=64)
+def _list_image_subdirs(parent, mtime_ns):
+    """List subdirectory names of parent that contain images
+
+    mtime_ns is part of the cache key: repeated Refresh clicks reuse
+    the cached walk while the input tree is unchanged, and any change
+    to the parent directory rolls the key so the cache misses.
+    Exposure-correction folders (*_corrected) are excluded.
+    """
+    names = []
+    with os.scandir(parent) as it:
+        for entry in it:
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            if entry.name.endswith('_corrected'):
+                continue
+            if dir_has_image(entry.path):
+                names.append(entry.name)
+    names.sort()
+    return tuple(names)
+
+class DequeRecordHandler(logging.handlers.QueueHandler):
+    """Queues raw log records for the UI without formatting them
+
+    Worker threads pay a single atomic deque append per log call;
+    formatting is deferred to the UI drain tick, which only formats
+    records that will actually be rendered — anything past the line
+    cap is dropped unformatted.
+    """
+    def enqueue(self, record):
+        self.queue.append(record)
+
+    def prepare(self, record):
+        # Same process, so the record can stay lazy; getMessage/format
+        # run on the UI side for the survivors only
+        return record
 
 class PhotogrammetryUI:
     def __init__(self):
@@ -49,7 +187,39 @@ class PhotogrammetryUI:
         self.automator = None
         self.processing_thread = None
         self.is_processing = False
-        self.log_queue = queue.Queue()
+        # Bounded deque: append/popleft are atomic under the GIL, so
+        # the log handoff needs no mutex or condition variable, and the
+        # maxlen caps memory if the workers out-pace the UI (oldest
+        # messages are dropped; the log file keeps everything)
+        self.log_queue = collections.deque(maxlen=10000)
+
+        # Thumbnail decoding runs off the Tk thread; the generation
+        # counter lets stale results be dropped when the user switches
+        # directories before the previous preview finished decoding
+        self.thumb_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="thumb")
+        self.preview_generation = 0
+        self.preview_switches = 0
+        self._exp_label_pending = False
+        self._idle_ticks = 0
+
+        # Short-TTL existence cache plus the last good ImageMagick
+        # probe, so repeated validation clicks don't re-stat network
+        # paths or spawn a magick subprocess every time
+        self._exists_cache = {}
+        self._magick_probe_ok = None
+
+        # Shared ProcessingDatabase; rebuilt only when the configured
+        # database path changes instead of per refresh click
+        self._db = None
+        self._db_path = None
+
+        # Scale the thumbnail size to the display: high-DPI screens get
+        # sharp icons, standard 96-DPI displays decode far fewer pixels
+        try:
+            dpi_scale = self.root.winfo_fpixels('1i') / 96.0
+        except Exception:
+            dpi_scale = 1.0
+        self.thumb_size = max(100, int(100 * dpi_scale))
         
         # Load saved settings
         self.settings_file = "ui_settings.json"
@@ -66,7 +236,16 @@ class PhotogrammetryUI:
         
         # Apply saved settings
         self.apply_settings()
-        
+
+        # Track edits from here on, so save_settings can skip the JSON
+        # write when nothing changed (apply_settings above doesn't count)
+        self._settings_dirty = False
+        for _key, attr in self._SETTING_VARS:
+            getattr(self, attr).trace_add("write", self._mark_settings_dirty)
+
+    def _mark_settings_dirty(self, *args):
+        self._settings_dirty = True
+
     def load_settings(self):
         """Load UI settings from file"""
         default_settings = {
@@ -86,36 +265,47 @@ class PhotogrammetryUI:
         }
         
         try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    saved_settings = json.load(f)
-                    default_settings.update(saved_settings)
+            saved_settings = _parse_settings(
+                self.settings_file, os.stat(self.settings_file).st_mtime_ns)
+            default_settings.update(saved_settings)
+        except FileNotFoundError:
+            pass
         except Exception as e:
             print(f"Error loading settings: {e}")
-        
+
         return default_settings
-    
+
+    # Settings key -> Tk variable attribute; load_settings defaults and
+    # save_settings both follow this table, so adding a setting means
+    # adding one row here plus its default
+    _SETTING_VARS = (
+        ("input_dir", "input_dir_var"),
+        ("output_dir", "output_dir_var"),
+        ("software_exe", "software_exe_var"),
+        ("software_type", "software_type_var"),
+        ("min_images", "min_images_var"),
+        ("queue_interval", "queue_interval_var"),
+        ("enable_exposure_correction", "enable_exposure_var"),
+        ("imagemagick_path", "imagemagick_path_var"),
+        ("exposure_adjustment", "exposure_adjustment_var"),
+        ("keep_originals", "keep_originals_var"),
+        ("max_workers", "max_workers_var"),
+        ("checkpoint_file", "checkpoint_file_var"),
+        ("database_file", "database_file_var"),
+    )
+
     def save_settings(self):
-        """Save current UI settings"""
-        settings = {
-            "input_dir": self.input_dir_var.get(),
-            "output_dir": self.output_dir_var.get(),
-            "software_exe": self.software_exe_var.get(),
-            "software_type": self.software_type_var.get(),
-            "min_images": self.min_images_var.get(),
-            "queue_interval": self.queue_interval_var.get(),
-            "enable_exposure_correction": self.enable_exposure_var.get(),
-            "imagemagick_path": self.imagemagick_path_var.get(),
-            "exposure_adjustment": self.exposure_adjustment_var.get(),
-            "keep_originals": self.keep_originals_var.get(),
-            "max_workers": self.max_workers_var.get(),
-            "checkpoint_file": self.checkpoint_file_var.get(),
-            "database_file": self.database_file_var.get()
-        }
-        
+        """Save current UI settings (skipped when nothing changed)"""
+        if not self._settings_dirty:
+            return
+
+        settings = {key: getattr(self, attr).get()
+                    for key, attr in self._SETTING_VARS}
+
         try:
             with open(self.settings_file, 'w') as f:
                 json.dump(settings, f, indent=2)
+            self._settings_dirty = False
         except Exception as e:
             print(f"Error saving settings: {e}")
     
@@ -390,7 +580,28 @@ class PhotogrammetryUI:
         self.thumbnails_frame = ctk.CTkScrollableFrame(preview_frame, label_text="Photos")
         self.thumbnails_frame.grid(row=4, column=0, sticky="nsew", padx=10, pady=5)
         self.thumbnails_frame.grid_columnconfigure((0, 1, 2, 3), weight=1)
-        
+
+        # Fixed pool of thumbnail slots, built once; directory switches
+        # re-bind image/text content instead of destroying and
+        # re-creating the widgets (CTk widget construction is costly)
+        self._thumb_slots = []
+        cols = 4
+        for i in range(20):
+            thumb_frame = ctk.CTkFrame(self.thumbnails_frame)
+            thumb_frame.grid(row=i // cols, column=i % cols, padx=5, pady=5, sticky="nsew")
+
+            img_label = ctk.CTkLabel(thumb_frame, text="")
+            img_label.grid(row=0, column=0, padx=5, pady=5)
+            # One shared handler for all slots; the path lives on the widget
+            img_label._image_path = None
+            img_label.bind("<Button-1>", self._on_thumb_click)
+
+            name_label = ctk.CTkLabel(thumb_frame, text="", font=ctk.CTkFont(size=10))
+            name_label.grid(row=1, column=0, padx=5, pady=(0, 5))
+
+            thumb_frame.grid_remove()  # hidden until a preview fills it
+            self._thumb_slots.append((thumb_frame, img_label, name_label))
+
         # Initialize photo data
         self.current_photos = []
         self.photo_thumbnails = []
@@ -456,17 +667,13 @@ class PhotogrammetryUI:
             row=0, column=0, columnspan=4, pady=(10, 5)
         )
         
-        self.pending_label = ctk.CTkLabel(stats_frame, text="Pending: 0")
-        self.pending_label.grid(row=1, column=0, padx=5, pady=2)
-        
-        self.completed_label = ctk.CTkLabel(stats_frame, text="Completed: 0")
-        self.completed_label.grid(row=1, column=1, padx=5, pady=2)
-        
-        self.failed_label = ctk.CTkLabel(stats_frame, text="Failed: 0")
-        self.failed_label.grid(row=1, column=2, padx=5, pady=2)
-        
-        self.queued_label = ctk.CTkLabel(stats_frame, text="Queued: 0")
-        self.queued_label.grid(row=1, column=3, padx=5, pady=2)
+        # One label for all four counters, so a stats refresh is a
+        # single configure/layout pass rather than four
+        self.stats_label = ctk.CTkLabel(
+            stats_frame,
+            text="Pending: 0   Completed: 0   Failed: 0   Queued: 0"
+        )
+        self.stats_label.grid(row=1, column=0, columnspan=4, padx=5, pady=2)
         
         # Database control buttons
         db_button_frame = ctk.CTkFrame(stats_frame)
@@ -497,6 +704,12 @@ class PhotogrammetryUI:
         )
         
         self.log_text = ctk.CTkTextbox(log_frame, state="disabled")
+        # Underlying tk.Text: the log writer toggles its state and
+        # inserts through it directly, skipping CTk's python-level
+        # configure path on every batch. Logs need no undo history, so
+        # keep Tk from maintaining one across bulk inserts
+        self._log_tk = self.log_text._textbox
+        self._log_tk.configure(undo=False, autoseparators=False, maxundo=0)
         self.log_text.grid(row=1, column=0, sticky="nsew", padx=10, pady=(0, 10))
         
         # Clear log button
@@ -508,12 +721,16 @@ class PhotogrammetryUI:
         ).grid(row=2, column=0, pady=(0, 10))
         
     def setup_logging(self):
-        """Setup logging to capture automator output"""
-        # Create custom handler
-        self.log_handler = LogHandler(self.log_queue)
+        """Setup logging to capture automator output
+
+        The handler attached to the automator logger appends raw
+        records straight into the bounded log deque; emitting from
+        worker threads is one atomic append, and update_logs formats
+        only the records it will actually render.
+        """
+        self.log_handler = DequeRecordHandler(self.log_queue)
         self.log_handler.setLevel(logging.INFO)
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        self.log_handler.setFormatter(formatter)
+        self._log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
         
     def apply_settings(self):
         """Apply loaded settings to UI"""
@@ -579,7 +796,20 @@ class PhotogrammetryUI:
         self.max_workers_entry.configure(state=state)
         
     def update_exposure_label(self, *args):
-        """Update exposure adjustment label"""
+        """Update exposure adjustment label (debounced)
+
+        Dragging the slider fires the variable trace for every
+        intermediate value; coalesce those into one label update per
+        50ms so each drag step does not trigger a Tk relayout.
+        """
+        if self._exp_label_pending:
+            return
+        self._exp_label_pending = True
+        self.root.after(50, self._flush_exposure_label)
+
+    def _flush_exposure_label(self):
+        """Apply the latest slider value to the label"""
+        self._exp_label_pending = False
         value = self.exposure_adjustment_var.get()
         self.exposure_label.configure(text=f"{value:.1f} stops")
     
@@ -592,19 +822,32 @@ class PhotogrammetryUI:
     
     def get_image_files(self, directory):
         """Get image files from directory"""
-        image_extensions = {'.jpg', '.jpeg', '.png', '.tiff', '.tif', '.bmp', '.raw', '.cr2', '.nef', '.arw'}
-        image_files = []
-        
+        return [path for path, _size in self.get_image_files_with_sizes(directory)]
+
+    def get_image_files_with_sizes(self, directory):
+        """Get sorted (path, size) pairs for the images in a directory
+
+        Built on os.scandir so the file-type check and the size both
+        come from the directory read itself, instead of one extra stat
+        syscall per file as iterdir + stat incurred.
+        """
+        entries = []
         try:
-            directory_path = Path(directory)
-            if directory_path.exists() and directory_path.is_dir():
-                for file in directory_path.iterdir():
-                    if file.is_file() and file.suffix.lower() in image_extensions:
-                        image_files.append(file)
-        except Exception as e:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if (entry.name.rpartition('.')[2].lower() in IMAGE_EXTS_NO_DOT
+                            and entry.is_file(follow_symlinks=False)):
+                        entries.append((Path(entry.path),
+                                        entry.stat(follow_symlinks=False).st_size))
+        except OSError as e:
             print(f"Error reading directory {directory}: {e}")
-        
-        return sorted(image_files)
+
+        entries.sort()
+        return entries
+
+    def _has_image_file(self, directory):
+        """Check whether a directory contains at least one image"""
+        return dir_has_image(directory)
     
     def refresh_preview_directories(self):
         """Refresh the list of available directories for preview"""
@@ -616,20 +859,10 @@ class PhotogrammetryUI:
             return
         
         try:
-            directories = []
-            input_path = Path(input_dir)
-            
-            for item in input_path.iterdir():
-                if item.is_dir():
-                    # Skip exposure correction folders (they are internal processing artifacts)
-                    if item.name.endswith('_corrected'):
-                        continue
-                        
-                    # Check if directory contains images
-                    image_files = self.get_image_files(item)
-                    if image_files:
-                        directories.append(item.name)
-            
+            # Cached walk; the key rolls whenever the input tree's mtime changes
+            directories = list(
+                _list_image_subdirs(input_dir, os.stat(input_dir).st_mtime_ns))
+
             if directories:
                 self.preview_dir_combo.configure(values=directories)
                 if directories:
@@ -666,140 +899,251 @@ class PhotogrammetryUI:
     
     def clear_photo_preview(self):
         """Clear the photo preview area"""
-        # Clear existing thumbnails
-        for widget in self.thumbnails_frame.winfo_children():
-            widget.destroy()
-        
-        self.current_photos = []
-        self.photo_thumbnails = []
+        # Hide the pooled thumbnail slots; they are reused, not destroyed
+        for thumb_frame, img_label, name_label in self._thumb_slots:
+            thumb_frame.grid_remove()
+
+        # clear() in place so the PhotoImage pixel buffers are released
+        # even if something else still holds the list objects
+        self.current_photos.clear()
+        self.photo_thumbnails.clear()
         self.photo_info_label.configure(text="No photos to display")
+
+        # Reclaim Pillow/Tk buffers promptly, but not on every switch
+        self.preview_switches += 1
+        if self.preview_switches % 10 == 0:
+            gc.collect()
     
     def load_photo_preview(self, directory_path):
-        """Load and display photo thumbnails"""
+        """Load and display photo thumbnails
+
+        The expensive part (opening and downscaling the full-size
+        images) is handed to the thumbnail worker pool; widgets are
+        created back on the Tk thread as each decode finishes, so the
+        UI stays responsive while a preview loads.
+        """
         try:
-            # Clear existing preview
+            # Clear existing preview and invalidate in-flight decodes
             self.clear_photo_preview()
-            
-            # Get image files
-            image_files = self.get_image_files(directory_path)
-            
+            self.preview_generation += 1
+            generation = self.preview_generation
+
+            # Get image files with their sizes from a single scan
+            image_files = self.get_image_files_with_sizes(directory_path)
+
             if not image_files:
                 self.photo_info_label.configure(text="No images found in selected directory")
                 return
-            
+
             # Update info label
-            total_size = sum(f.stat().st_size for f in image_files) / (1024 * 1024)  # MB
+            total_size = sum(size for _f, size in image_files) / (1024 * 1024)  # MB
             self.photo_info_label.configure(
                 text=f"Found {len(image_files)} images, Total size: {total_size:.1f} MB"
             )
-            
-            # Load thumbnails (limit to first 20 for performance)
-            max_thumbnails = 20
+
+            # Load thumbnails (limited to the slot pool for performance)
+            max_thumbnails = len(self._thumb_slots)
             display_files = image_files[:max_thumbnails]
-            
+
             if len(image_files) > max_thumbnails:
                 self.photo_info_label.configure(
                     text=f"Showing {max_thumbnails} of {len(image_files)} images, Total size: {total_size:.1f} MB"
                 )
-            
-            # Create thumbnails in a grid
-            cols = 4
-            for i, image_file in enumerate(display_files):
-                row = i // cols
-                col = i % cols
-                
-                try:
-                    # Load and resize image
-                    with Image.open(image_file) as img:
-                        # Create thumbnail
-                        img.thumbnail((150, 150), Image.Resampling.LANCZOS)
-                        
-                        # Convert to PhotoImage
-                        photo = ImageTk.PhotoImage(img)
-                        
-                        # Create frame for thumbnail
-                        thumb_frame = ctk.CTkFrame(self.thumbnails_frame)
-                        thumb_frame.grid(row=row, column=col, padx=5, pady=5, sticky="nsew")
-                        
-                        # Create label with image
-                        img_label = ctk.CTkLabel(
-                            thumb_frame,
-                            image=photo,
-                            text="",
-                        )
-                        img_label.grid(row=0, column=0, padx=5, pady=5)
-                        
-                        # Create filename label
-                        name_label = ctk.CTkLabel(
-                            thumb_frame,
-                            text=image_file.name[:15] + "..." if len(image_file.name) > 15 else image_file.name,
-                            font=ctk.CTkFont(size=10)
-                        )
-                        name_label.grid(row=1, column=0, padx=5, pady=(0, 5))
-                        
-                        # Keep reference to prevent garbage collection
-                        self.photo_thumbnails.append(photo)
-                        self.current_photos.append(image_file)
-                        
-                        # Add click handler to show full size
-                        img_label.bind("<Button-1>", lambda e, path=image_file: self.show_full_image(path))
-                        
-                except Exception as e:
-                    print(f"Error loading thumbnail for {image_file.name}: {e}")
-                    # Create error placeholder
-                    thumb_frame = ctk.CTkFrame(self.thumbnails_frame)
-                    thumb_frame.grid(row=row, column=col, padx=5, pady=5, sticky="nsew")
-                    
-                    error_label = ctk.CTkLabel(
-                        thumb_frame,
-                        text="Error\nloading\nimage",
-                        font=ctk.CTkFont(size=10)
-                    )
-                    error_label.grid(row=0, column=0, padx=5, pady=5)
-                    
+
+            for i, (image_file, _size) in enumerate(display_files):
+                self.thumb_pool.submit(self._decode_thumbnail, generation, i, image_file)
+
         except Exception as e:
             self.photo_info_label.configure(text=f"Error loading photos: {str(e)}")
             print(f"Error in load_photo_preview: {e}")
+
+    def _decode_thumbnail(self, generation, index, image_file):
+        """Decode and downscale one image on a worker thread"""
+        from PIL import Image
+
+        if generation != self.preview_generation:
+            return  # preview changed while this job was queued
+
+        size = self.thumb_size
+        thumbnail = None
+        try:
+            cache_path = thumb_cache_path(image_file, size)
+        except OSError:
+            cache_path = None
+
+        # Fast path: reuse the cached thumbnail from a previous session
+        if cache_path is not None and cache_path.exists():
+            try:
+                with Image.open(cache_path) as img:
+                    thumbnail = img.copy()
+            except Exception:
+                thumbnail = None  # corrupt cache entry; re-decode below
+
+        if thumbnail is None:
+            try:
+                thumbnail = decode_thumb_image(image_file, size)
+            except Exception as e:
+                print(f"Error loading thumbnail for {image_file.name}: {e}")
+                thumbnail = None
+
+            if thumbnail is not None and cache_path is not None:
+                try:
+                    THUMB_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                    thumbnail.save(cache_path, "PNG")
+                except Exception:
+                    pass  # cache is best-effort; the preview still works
+
+        # Widget creation must happen on the Tk thread
+        self.root.after(0, self._install_thumbnail, generation, index, image_file, thumbnail)
+
+    def _install_thumbnail(self, generation, index, image_file, thumbnail):
+        """Bind a decoded thumbnail into its pooled slot (Tk thread only)"""
+        from PIL import ImageTk
+
+        if generation != self.preview_generation:
+            return  # stale result from a previous directory selection
+        if index >= len(self._thumb_slots):
+            return
+
+        thumb_frame, img_label, name_label = self._thumb_slots[index]
+        thumb_frame.grid()  # re-show at its original grid position
+
+        name = image_file.name
+        display_name = name if len(name) <= NAME_MAX else name[:NAME_MAX] + "…"
+
+        if thumbnail is None:
+            # Error placeholder
+            img_label.configure(image=None, text="Error\nloading\nimage")
+            img_label._image_path = None
+            name_label.configure(text=display_name)
+            return
+
+        # Convert to PhotoImage
+        photo = ImageTk.PhotoImage(thumbnail)
+        img_label.configure(image=photo, text="")
+        name_label.configure(text=display_name)
+
+        # Keep reference to prevent garbage collection
+        self.photo_thumbnails.append(photo)
+        self.current_photos.append(image_file)
+
+        # Point the shared click handler at this slot's image
+        img_label._image_path = image_file
+
+    def _on_thumb_click(self, event):
+        """Open the full-size viewer for the clicked thumbnail slot"""
+        # CTk delivers the event from an internal child widget, so look
+        # for the path on the widget first and then its CTkLabel parent
+        path = getattr(event.widget, "_image_path", None)
+        if path is None:
+            path = getattr(event.widget.master, "_image_path", None)
+        if path is not None:
+            self.show_full_image(path)
     
     def show_full_image(self, image_path):
-        """Show full size image in a popup window"""
+        """Show full size image in a popup window
+
+        Opens instantly from the on-disk thumbnail cache when one
+        exists, then swaps in a proper high-resolution decode produced
+        on the worker pool. JPEGs use draft-mode decoding so even the
+        high-resolution pass never materialises the full 24MP frame
+        just to fit a 750x550 label.
+        """
+        from PIL import Image, ImageTk
+
         try:
             # Create new window
             popup = ctk.CTkToplevel(self.root)
             popup.title(f"Image Viewer - {image_path.name}")
             popup.geometry("800x600")
-            
-            # Load and display image
-            with Image.open(image_path) as img:
-                # Calculate size to fit window while maintaining aspect ratio
-                display_size = (750, 550)
-                img.thumbnail(display_size, Image.Resampling.LANCZOS)
-                
-                photo = ImageTk.PhotoImage(img)
-                
-                # Create and pack image label
-                img_label = ctk.CTkLabel(popup, image=photo, text="")
-                img_label.pack(expand=True, fill="both", padx=10, pady=10)
-                
-                # Info label
-                file_size = image_path.stat().st_size / (1024 * 1024)  # MB
-                info_text = f"File: {image_path.name}\nSize: {file_size:.2f} MB\nDimensions: {img.size[0]}x{img.size[1]}"
-                
-                info_label = ctk.CTkLabel(popup, text=info_text)
-                info_label.pack(pady=5)
-                
-                # Keep reference to prevent garbage collection
-                popup.photo = photo
-                
+
+            img_label = ctk.CTkLabel(popup, text="Loading...")
+            img_label.pack(expand=True, fill="both", padx=10, pady=10)
+
+            # One stat serves both the size readout and the cache key
+            st = os.stat(image_path)
+            file_size = st.st_size / (1024 * 1024)  # MB
+            info_label = ctk.CTkLabel(popup, text=f"File: {image_path.name}\nSize: {file_size:.2f} MB")
+            info_label.pack(pady=5)
+
+            # Immediate low-resolution preview from the thumbnail cache
+            try:
+                cache_path = thumb_cache_path(image_path, self.thumb_size, st.st_mtime_ns)
+                if cache_path.exists():
+                    with Image.open(cache_path) as img:
+                        photo = ImageTk.PhotoImage(img)
+                    img_label.configure(image=photo, text="")
+                    popup.photo = photo
+            except Exception:
+                pass  # the high-resolution decode below still runs
+
+            self.thumb_pool.submit(self._decode_full_image, popup, img_label,
+                                   info_label, image_path, file_size)
+
         except Exception as e:
             messagebox.showerror("Error", f"Could not display image: {str(e)}")
+
+    def _decode_full_image(self, popup, img_label, info_label, image_path, file_size):
+        """Decode the high-resolution popup image on a worker thread"""
+        from PIL import Image
+
+        try:
+            with Image.open(image_path) as img:
+                if img.format == 'JPEG':
+                    img.draft('RGB', (1500, 1500))
+                # Fit the window keeping aspect ratio; BILINEAR is ~3x
+                # cheaper than LANCZOS and indistinguishable for an
+                # on-screen preview at this size
+                img.thumbnail((750, 550), Image.Resampling.BILINEAR)
+                full = img.copy()
+        except Exception as e:
+            print(f"Error decoding {image_path.name}: {e}")
+            return
+
+        info_text = f"File: {image_path.name}\nSize: {file_size:.2f} MB\nDimensions: {full.size[0]}x{full.size[1]}"
+        self.root.after(0, self._install_full_image, popup, img_label,
+                        info_label, full, info_text)
+
+    def _install_full_image(self, popup, img_label, info_label, full, info_text):
+        """Swap the high-resolution decode into the popup (Tk thread only)"""
+        from PIL import ImageTk
+
+        try:
+            if not popup.winfo_exists():
+                return  # popup was closed before the decode finished
+            photo = ImageTk.PhotoImage(full)
+            img_label.configure(image=photo, text="")
+            info_label.configure(text=info_text)
+            # Keep reference to prevent garbage collection
+            popup.photo = photo
+        except Exception:
+            pass
     
+    def _get_db(self):
+        """Return the shared ProcessingDatabase for the configured path
+
+        Opening a SQLite database means file open, schema check and
+        pragmas; caching the instance amortizes that across the status
+        and stats refreshes. A path change closes the old instance and
+        opens the new one.
+        """
+        from database import ProcessingDatabase
+        path = self.database_file_var.get()
+        if self._db is None or self._db_path != path:
+            if self._db is not None:
+                try:
+                    self._db.close()
+                except Exception:
+                    pass
+            self._db = ProcessingDatabase(path)
+            self._db_path = path
+        return self._db
+
     def get_directory_status(self, directory_name):
         """Get the processing status of a directory"""
         try:
-            from database import ProcessingDatabase
-            db = ProcessingDatabase(self.database_file_var.get())
-            
+            db = self._get_db()
+
             # Check database first
             completed_dirs = {d['name']: d for d in db.get_completed_directories()}
             failed_dirs = {d['name']: d for d in db.get_failed_directories()}
@@ -979,40 +1323,65 @@ class PhotogrammetryUI:
             )
             error_label.grid(row=0, column=0, columnspan=3, pady=10)
         
+    _EXISTS_TTL = 5.0  # seconds a cached existence result stays valid
+
+    def _cached_exists(self, path):
+        """os.path.exists with a short-TTL cache
+
+        Validation can be clicked repeatedly while tuning settings;
+        on network filesystems each stat is a round-trip, so positive
+        and negative results are both reused for a few seconds.
+        """
+        now = time.monotonic()
+        cached = self._exists_cache.get(path)
+        if cached is not None and now - cached[0] < self._EXISTS_TTL:
+            return cached[1]
+        exists = os.path.exists(path)
+        self._exists_cache[path] = (now, exists)
+        return exists
+
     def validate_settings(self):
         """Validate current settings"""
         errors = []
-        
+
         # Check input directory
         if not self.input_dir_var.get():
             errors.append("Input directory is required")
-        elif not os.path.exists(self.input_dir_var.get()):
+        elif not self._cached_exists(self.input_dir_var.get()):
             errors.append("Input directory does not exist")
-            
+
         # Check output directory
         if not self.output_dir_var.get():
             errors.append("Output directory is required")
-            
+
         # Check software executable
         if not self.software_exe_var.get():
             errors.append("Software executable is required")
-        elif not os.path.exists(self.software_exe_var.get()):
+        elif not self._cached_exists(self.software_exe_var.get()):
             errors.append("Software executable does not exist")
-            
-        # Check ImageMagick if exposure correction is enabled
-        if self.enable_exposure_var.get():
-            try:
-                import subprocess
-                result = subprocess.run(
-                    [self.imagemagick_path_var.get(), '-version'],
-                    capture_output=True, text=True, timeout=10
-                )
-                if result.returncode != 0:
-                    errors.append("ImageMagick test failed")
-            except FileNotFoundError:
-                errors.append(f"ImageMagick not found at: {self.imagemagick_path_var.get()}")
-            except Exception as e:
-                errors.append(f"ImageMagick error: {str(e)}")
+
+        # Check ImageMagick if exposure correction is enabled; a path
+        # that already probed successfully is not re-probed
+        magick_path = self.imagemagick_path_var.get()
+        if self.enable_exposure_var.get() and magick_path != self._magick_probe_ok:
+            if shutil.which(magick_path) is None:
+                # Not on PATH and not an executable file: no point forking
+                errors.append(f"ImageMagick not found at: {magick_path}")
+            else:
+                try:
+                    import subprocess
+                    result = subprocess.run(
+                        [magick_path, '-version'],
+                        capture_output=True, text=True, timeout=10
+                    )
+                    if result.returncode != 0:
+                        errors.append("ImageMagick test failed")
+                    else:
+                        self._magick_probe_ok = magick_path
+                except FileNotFoundError:
+                    errors.append(f"ImageMagick not found at: {magick_path}")
+                except Exception as e:
+                    errors.append(f"ImageMagick error: {str(e)}")
         
         if errors:
             error_msg = "Validation errors:\n\n" + "\n".join(f"• {error}" for error in errors)
@@ -1036,33 +1405,67 @@ class PhotogrammetryUI:
         self.start_button.configure(state="disabled")
         self.stop_button.configure(state="normal")
         self.status_label.configure(text="Processing...")
-        self.progress_bar.set(0.5)  # Indeterminate progress
-        
+        self.progress_bar.set(0)
+
         # Save current settings
         self.save_settings()
-        
+
+        # Snapshot all Tk variables here on the UI thread; the worker
+        # gets a plain dict, since variable access from other threads
+        # has to cross into (and is not guaranteed safe under) the Tcl
+        # interpreter
+        cfg = {key: getattr(self, attr).get() for key, attr in self._SETTING_VARS}
+
         # Start processing thread
-        self.processing_thread = threading.Thread(target=self.run_processing, daemon=True)
+        self.processing_thread = threading.Thread(
+            target=self.run_processing, args=(cfg,), daemon=True)
         self.processing_thread.start()
-        
-    def run_processing(self):
-        """Run the processing (called in separate thread)"""
+
+        # Sample overall progress at 5Hz; per-file updates would flood Tk
+        self._last_progress = 0.0
+        self.root.after(200, self._poll_progress)
+
+    def _poll_progress(self):
+        """Sample the automator's progress into the progress bar
+
+        The bar is only touched when the fraction moved by more than
+        1%, so a long-running directory does not cause redundant Tk
+        updates ten times a second.
+        """
+        if not self.is_processing:
+            return
+        automator = self.automator
+        if automator is not None:
+            fraction = getattr(automator, 'progress_fraction', 0.0)
+            if abs(fraction - self._last_progress) > 0.01:
+                self.progress_bar.set(fraction)
+                self._last_progress = fraction
+        self.root.after(200, self._poll_progress)
+        
+    def run_processing(self, cfg):
+        """Run the processing (called in separate thread)
+
+        cfg is the settings snapshot taken on the UI thread; no Tk
+        variable is touched from here.
+        """
         try:
+            from main import PhotogrammetryAutomator
+
             # Create automator instance
             self.automator = PhotogrammetryAutomator(
-                input_dir=self.input_dir_var.get(),
-                output_dir=self.output_dir_var.get(),
-                software_exe=self.software_exe_var.get(),
-                software_type=self.software_type_var.get(),
-                checkpoint_file=self.checkpoint_file_var.get(),
-                database_file=self.database_file_var.get(),
-                min_images=self.min_images_var.get(),
-                queue_check_interval=self.queue_interval_var.get(),
-                enable_exposure_correction=self.enable_exposure_var.get(),
-                imagemagick_path=self.imagemagick_path_var.get(),
-                exposure_adjustment=self.exposure_adjustment_var.get(),
-                keep_originals=self.keep_originals_var.get(),
-                max_workers=self.max_workers_var.get()
+                input_dir=cfg["input_dir"],
+                output_dir=cfg["output_dir"],
+                software_exe=cfg["software_exe"],
+                software_type=cfg["software_type"],
+                checkpoint_file=cfg["checkpoint_file"],
+                database_file=cfg["database_file"],
+                min_images=cfg["min_images"],
+                queue_check_interval=cfg["queue_interval"],
+                enable_exposure_correction=cfg["enable_exposure_correction"],
+                imagemagick_path=cfg["imagemagick_path"],
+                exposure_adjustment=cfg["exposure_adjustment"],
+                keep_originals=cfg["keep_originals"],
+                max_workers=cfg["max_workers"]
             )
             
             # Add our log handler to capture output
@@ -1073,10 +1476,10 @@ class PhotogrammetryUI:
             self.automator.run()
             
             # Processing completed successfully
-            self.log_queue.put("INFO: Processing completed successfully!")
+            self.log_queue.append("INFO: Processing completed successfully!")
             
         except Exception as e:
-            self.log_queue.put(f"ERROR: Processing failed: {str(e)}")
+            self.log_queue.append(f"ERROR: Processing failed: {str(e)}")
         finally:
             # Reset UI state
             self.root.after(0, self.processing_finished)
@@ -1086,7 +1489,7 @@ class PhotogrammetryUI:
         if self.is_processing and self.automator:
             # Note: This is a simple stop - for more graceful stopping,
             # you might want to add a stop flag to the PhotogrammetryAutomator class
-            self.log_queue.put("INFO: Stop requested by user")
+            self.log_queue.append("INFO: Stop requested by user")
             self.processing_finished()
             
     def processing_finished(self):
@@ -1097,66 +1500,137 @@ class PhotogrammetryUI:
         self.status_label.configure(text="Ready")
         self.progress_bar.set(0)
         
-        # Refresh database stats and directory status after processing
-        try:
-            self.refresh_database_stats()
-            self.refresh_directory_status()
-        except Exception:
-            pass
+        # Refresh database stats and directory status after processing,
+        # but only if the run actually wrote anything (stopping a run
+        # before it touched the database skips the SQL round-trips)
+        automator = self.automator
+        dirty = automator is None or automator.db_dirty.is_set()
+        if dirty:
+            try:
+                self.refresh_database_stats()
+                self.refresh_directory_status()
+            except Exception:
+                pass
+            if automator is not None:
+                automator.db_dirty.clear()
         
+    MAX_LOG_LINES = 5000
+
     def update_logs(self):
-        """Update log display with new messages"""
+        """Update log display with new messages
+
+        Drains everything queued since the last tick and applies it as a
+        single insert, so the text widget re-renders once per 100ms tick
+        instead of once per message. The widget is capped at
+        MAX_LOG_LINES lines; the oldest lines are dropped once the cap
+        is exceeded (the full history is still in the log file).
+
+        While the textbox is not viewable (hidden or scrolled away) no
+        Tk work happens at all: messages stay queued, the poll relaxes
+        to 500ms, and everything accumulated is flushed in one batch
+        when the panel comes back.
+
+        The poll interval also backs off while the queue stays empty
+        (100ms stretching to 500ms after a few quiet ticks) so an idle
+        app wakes Tk 2 times a second instead of 10, and snaps back to
+        100ms as soon as a message arrives.
+        """
         try:
-            while True:
-                log_message = self.log_queue.get_nowait()
-                
-                # Add timestamp and message to log
-                timestamp = datetime.now().strftime("%H:%M:%S")
-                formatted_message = f"[{timestamp}] {log_message}\n"
-                
-                # Update log text widget
-                self.log_text.configure(state="normal")
-                self.log_text.insert("end", formatted_message)
-                self.log_text.see("end")  # Scroll to bottom
-                self.log_text.configure(state="disabled")
-                
-        except queue.Empty:
-            pass
-        
-        # Schedule next update
-        self.root.after(100, self.update_logs)
+            visible = self.log_text.winfo_viewable()
+        except Exception:
+            visible = True
+        if not visible:
+            self.root.after(500, self.update_logs)
+            return
+
+        messages = []
+        while True:
+            try:
+                messages.append(self.log_queue.popleft())
+            except IndexError:
+                break
+
+        if messages:
+            # Anything past the line cap would be trimmed straight back
+            # out of the widget, so don't pay to format it
+            messages = messages[-self.MAX_LOG_LINES:]
+            fmt = self._log_formatter.format
+            timestamp = datetime.now().strftime("%H:%M:%S")
+            # Entries are raw LogRecords from the handler or plain
+            # strings pushed directly by UI actions
+            block = "".join(
+                f"[{timestamp}] {msg if isinstance(msg, str) else fmt(msg)}\n"
+                for msg in messages)
+
+            log_tk = self._log_tk
+            log_tk.configure(state="normal")
+            log_tk.insert("end", block)
+
+            # Trim oldest lines beyond the cap
+            line_count = int(log_tk.index("end-1c").split(".")[0])
+            excess = line_count - self.MAX_LOG_LINES
+            if excess > 0:
+                log_tk.delete("1.0", f"{excess + 1}.0")
+
+            log_tk.see("end")  # Scroll to bottom
+            log_tk.configure(state="disabled")
+
+        # Schedule next update, backing off while idle
+        if messages:
+            self._idle_ticks = 0
+            delay = 100
+        else:
+            self._idle_ticks += 1
+            delay = min(500, 100 * self._idle_ticks)
+        self.root.after(delay, self.update_logs)
         
     def clear_log(self):
         """Clear the log display"""
-        self.log_text.configure(state="normal")
-        self.log_text.delete("1.0", "end")
-        self.log_text.configure(state="disabled")
+        self._log_tk.configure(state="normal")
+        self._log_tk.delete("1.0", "end")
+        self._log_tk.configure(state="disabled")
     
     def refresh_database_stats(self):
-        """Refresh database statistics display"""
+        """Refresh database statistics display
+
+        The SQL runs on a worker thread; only the constant-time label
+        update comes back to the mainloop, so a slow or contended
+        database never janks the UI. The database handle is resolved
+        here so the worker touches no Tk variables.
+        """
+        try:
+            db = self._get_db()
+        except Exception as e:
+            self.log_queue.append(f"ERROR: Failed to refresh database stats: {str(e)}")
+            return
+
+        threading.Thread(target=self._bg_refresh_stats, args=(db,), daemon=True).start()
+
+    def _bg_refresh_stats(self, db):
+        """Query stats off the UI thread and post the result back"""
         try:
-            from database import ProcessingDatabase
-            db = ProcessingDatabase(self.database_file_var.get())
-            
             stats = db.get_processing_stats()
             status_counts = stats.get('status_counts', {})
-            
-            self.pending_label.configure(text=f"Pending: {status_counts.get('pending', 0)}")
-            self.completed_label.configure(text=f"Completed: {status_counts.get('completed', 0)}")
-            self.failed_label.configure(text=f"Failed: {status_counts.get('failed', 0)}")
-            self.queued_label.configure(text=f"Queued: {status_counts.get('queued', 0)}")
-            
-            self.log_queue.put(f"INFO: Database stats refreshed - {len(status_counts)} status types found")
-            
+            self.root.after(0, self._apply_stats, status_counts)
         except Exception as e:
-            self.log_queue.put(f"ERROR: Failed to refresh database stats: {str(e)}")
+            self.log_queue.append(f"ERROR: Failed to refresh database stats: {str(e)}")
+
+    def _apply_stats(self, status_counts):
+        """Write the fetched counts into the stats label (Tk thread only)"""
+        self.stats_label.configure(text=(
+            f"Pending: {status_counts.get('pending', 0)}   "
+            f"Completed: {status_counts.get('completed', 0)}   "
+            f"Failed: {status_counts.get('failed', 0)}   "
+            f"Queued: {status_counts.get('queued', 0)}"
+        ))
+
+        self.log_queue.append(f"INFO: Database stats refreshed - {len(status_counts)} status types found")
     
     def reset_failed_directories(self):
         """Reset failed directories to pending status"""
         try:
-            from database import ProcessingDatabase
-            db = ProcessingDatabase(self.database_file_var.get())
-            
+            db = self._get_db()
+
             # Get failed directories
             failed_dirs = db.get_failed_directories()
             
@@ -1172,17 +1646,17 @@ class PhotogrammetryUI:
             )
             
             if result:
-                # Reset failed directories to pending
-                for dir_info in failed_dirs:
-                    db.update_directory_status(dir_info['name'], 'pending')
-                
-                self.log_queue.put(f"INFO: Reset {len(failed_dirs)} failed directories to pending status")
+                # Reset all failed directories in one transaction
+                db.update_directory_statuses(
+                    [d['name'] for d in failed_dirs], 'pending')
+
+                self.log_queue.append(f"INFO: Reset {len(failed_dirs)} failed directories to pending status")
                 self.refresh_database_stats()
                 messagebox.showinfo("Reset Complete", f"Successfully reset {len(failed_dirs)} directories.")
             
         except Exception as e:
             error_msg = f"Failed to reset failed directories: {str(e)}"
-            self.log_queue.put(f"ERROR: {error_msg}")
+            self.log_queue.append(f"ERROR: {error_msg}")
             messagebox.showerror("Reset Failed", error_msg)
         
     def run(self):
@@ -1202,7 +1676,17 @@ class PhotogrammetryUI:
                 
         # Save settings before closing
         self.save_settings()
-        
+
+        # Drop any queued thumbnail decodes
+        self.thumb_pool.shutdown(wait=False, cancel_futures=True)
+
+        # Close the shared database connection
+        if self._db is not None:
+            try:
+                self._db.close()
+            except Exception:
+                pass
+
         # Close application
         self.root.destroy()
 